@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Compares the old recursive flattener with the single pass iterative one.
+
+The resource tree is generated in memory, its size is the size of the equivalent YAML text dumped by yaml.safe_dump.
+
+Usage: PYTHONPATH=. python benchmark/bench_flatten.py [size_mb]
+"""
+
+from __future__ import print_function
+import sys
+import time
+
+import yaml
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: nocover
+    tracemalloc = None
+
+from yaml_rulz.list_handler import ListHandler
+from yaml_rulz.yaml_handler import ResourceHandler
+
+
+DEFAULT_SIZE_MB = 100
+
+
+def generate_host(index):
+    return {
+        "name": "host{0}".format(index),
+        "enabled": True,
+        "mtu": 1500,
+        "management": {"address": "10.0.{0}.{1}".format(index // 256 % 256, index % 256), "port": 22},
+        "interfaces": [
+            {"name": "eth{0}".format(nic), "vlan_tag": index % 4096, "addr": "192.168.{0}.1/24".format(nic)}
+            for nic in range(2)
+        ],
+        "tags": ["rack{0}".format(index % 40), "row{0}".format(index % 8)],
+    }
+
+
+def get_host_size(index):
+    # Size of one host in the dumped list, including its indentation
+    one_host = yaml.safe_dump({"inventory": {"hosts": [generate_host(index)]}})
+    two_hosts = yaml.safe_dump({"inventory": {"hosts": [generate_host(index), generate_host(index)]}})
+    return len(two_hosts) - len(one_host)
+
+
+def get_host_count(size_mb):
+    # Hosts in the middle of the list have the typical width of the numbers
+    size = size_mb * 1024 * 1024
+    return size // get_host_size(size // get_host_size(0) // 2)
+
+
+def generate_resource(size_mb):
+    return {"inventory": {"hosts": [generate_host(index) for index in range(get_host_count(size_mb))]}}
+
+
+def legacy_flatten(handler, parsed_yml):
+    def flatten_items(items, parent):
+        flattened_items = []
+        for key, value in items:
+            prefix = parent + str(key)
+            if isinstance(value, list):
+                flattened_items.append((prefix, []))
+                flattened_items.extend(flatten_items(list(enumerate(value)), parent=prefix + handler.separator))
+            elif isinstance(value, dict):
+                flattened_items.extend(flatten_items(value.items(), parent=prefix + handler.separator))
+            else:
+                flattened_items.append((prefix, value))
+        return flattened_items
+
+    flat_yml = dict(flatten_items(parsed_yml.items(), parent=""))
+    list_types = ListHandler(flat_yml, handler.separator).list_types
+    scalars = dict([(key, value) for key, value in flat_yml.items() if key not in list_types])
+    return flat_yml, scalars, list_types
+
+
+def single_pass_flatten(handler, parsed_yml):
+    return handler._get_flat_dicts(parsed_yml)  # pylint: disable = protected-access
+
+
+def measure(function, handler, parsed_yml):
+    start = time.time()
+    function(handler, parsed_yml)
+    elapsed = time.time() - start
+    peak = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        function(handler, parsed_yml)
+        peak = tracemalloc.get_traced_memory()[1] / 1024.0 / 1024.0
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(size_mb):
+    handler = ResourceHandler("")
+    parsed_yml = generate_resource(size_mb)
+    print("Resource: ~{0} MB of YAML".format(size_mb))
+    print("{0:<12} {1:>10} {2:>16}".format("flattener", "time [s]", "peak memory [MB]"))
+    for name, function in (("recursive", legacy_flatten), ("single pass", single_pass_flatten)):
+        elapsed, peak = measure(function, handler, parsed_yml)
+        print("{0:<12} {1:10.2f} {2:>16}".format(name, elapsed, "n/a" if peak is None else "{0:.1f}".format(peak)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE_MB)
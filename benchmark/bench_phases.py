@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+"""Measures the validation phases on synthetic schemas and resources.
+
+Every scenario generates a schema, a matching resource (with a few failures) and an exclusions file from a fixed seed,
+so the same scenario measures the same work on every commit. The phases are timed separately, the best of the repeats
+is reported: parsing, flattening and grouping the resource, compiling the schema, evaluating the rules and reporting
+(severity update and raw JSON output). Save the results of a commit with --save and compare another commit to them
+with --compare.
+
+Usage: PYTHONPATH=. python benchmark/bench_phases.py [scenario ...] [--scale 0.1] [--save base.json]
+       PYTHONPATH=. python benchmark/bench_phases.py --keys 5000 --list-length 100 --depth 4 --rules "~@!" \\
+           --references 0.1
+"""
+
+from __future__ import print_function
+from argparse import ArgumentParser
+from collections import OrderedDict
+import json
+import platform
+import random
+import subprocess
+import time
+
+import yaml
+
+from yaml_rulz.list_handler import ListHandler
+from yaml_rulz.rulebook import ReferenceResolver
+from yaml_rulz.validator import CompiledSchema
+from yaml_rulz.validator import YAMLValidator
+from yaml_rulz.yaml_handler import ResourceHandler
+
+
+PHASES = ["parse", "flatten", "grouping", "compile", "rules", "reporting", "total"]
+RULE_TOKENS = "~@!><?"
+SECTION_SIZE = 50
+FAILURE_RATE = 0.05
+DEFAULT_REPEAT = 3
+DEFAULT_SEED = 42
+SCENARIOS = OrderedDict([
+    ("scalars", {"keys": 20000, "list_length": 0, "depth": 2, "rules": RULE_TOKENS, "references": 0.0}),
+    ("lists", {"keys": 100, "list_length": 5000, "depth": 2, "rules": RULE_TOKENS, "references": 0.0}),
+    ("deep", {"keys": 5000, "list_length": 500, "depth": 20, "rules": RULE_TOKENS, "references": 0.0}),
+    ("regexp", {"keys": 20000, "list_length": 1000, "depth": 2, "rules": "~~@", "references": 0.0}),
+    ("references", {"keys": 5000, "list_length": 1000, "depth": 2, "rules": "><!", "references": 0.2}),
+])
+DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+class ScenarioGenerator(object):
+
+    # Each rule token has a schema rule and a resource value, a few values fail the rule on purpose
+
+    def __init__(self, rules, references, seed):
+        self.rules = rules
+        self.references = references
+        self.random = random.Random(seed)
+
+    def generate(self, keys, list_length, depth):
+        schema, resource = {}, {}
+        schema_leaf, resource_leaf = schema, resource
+        path = ["root"] + ["level_{0}".format(level) for level in range(depth - 1)]
+        for name in path:
+            schema_leaf = schema_leaf.setdefault(name, {})
+            resource_leaf = resource_leaf.setdefault(name, {})
+        prefix = ":".join(path)
+        for section in range(keys // SECTION_SIZE + 1):
+            section_keys = range(min(SECTION_SIZE, keys - section * SECTION_SIZE))
+            if not section_keys:
+                break
+            section_prefix = "{0}:section_{1}".format(prefix, section)
+            section_schema = schema_leaf["section_{0}".format(section)] = {"limit": "@ num"}
+            section_resource = resource_leaf["section_{0}".format(section)] = {"limit": 1000}
+            for key in section_keys:
+                token = self.random.choice(self.rules)
+                name = "{0}_{1}".format(self._get_field_name(token), key)
+                section_schema[name], section_resource[name] = self._generate_rule(token, section_prefix, key,
+                                                                                   section_prefix + ":limit")
+        if list_length:
+            schema_leaf["items"] = [self._generate_item(prefix, 0, schema=True)]
+            resource_leaf["items"] = [self._generate_item(prefix, index) for index in range(list_length)]
+        exclusions = "{0}:section_0:.*\n".format(prefix)
+        return yaml.dump(schema, Dumper=DUMPER), yaml.dump(resource, Dumper=DUMPER), exclusions
+
+    def _generate_item(self, prefix, index, schema=False):
+        item = {}
+        for token in sorted(set(self.rules)):
+            # Every item must match the single prototype, so the rules of the items do not depend on the index
+            rule, value = self._generate_rule(token, "{0}:items:{1}".format(prefix, index), index,
+                                              prefix + ":section_0:limit", variant=0)
+            item[self._get_field_name(token)] = rule if schema else value
+        return item
+
+    def _generate_rule(self, token, parent, index, limit_key, variant=None):  # pylint: disable = too-many-arguments
+        # Returns (rule, value), cross references point to the limit_key
+        fails = self.random.random() < FAILURE_RATE
+        if token == "~":
+            return "~ ^value_\\d+$", "invalid" if fails else "value_{0}".format(index)
+        if token == "@":
+            if (index if variant is None else variant) % 2:
+                return "@ num", "n/a" if fails else index
+            return "@ ipv4", "10.0.{0}.{1}".format(index // 256 % 256, 256 if fails else index % 256)
+        if token == "!":
+            return "! .*:unique(_\\d+)?$", "duplicate" if fails else "{0}:{1}".format(parent, index)
+        if token in "<>":
+            if self.random.random() < self.references:
+                criterion = limit_key
+            else:
+                criterion = "1000"
+            value = 500 if (token == "<") != fails else 1500
+            return "{0} {1}".format(token, criterion), value
+        return "? true", not fails
+
+    @staticmethod
+    def _get_field_name(token):
+        return {"~": "name", "@": "address", "!": "unique", ">": "above", "<": "below", "?": "enabled"}[token]
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"]).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(function, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.time()
+        result = function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_scenario(schema_content, resource_content, exclusions_content, repeat):
+    # pylint: disable = protected-access
+    timings = OrderedDict()
+    handler = ResourceHandler("")
+    timings["parse"], parsed_yml = measure(lambda: handler._import_yml(resource_content), repeat)
+    timings["flatten"], (flat_yml, _, list_types) = measure(lambda: handler._get_flat_dicts(parsed_yml), repeat)
+    timings["grouping"], _ = measure(lambda: ListHandler(flat_yml, handler.separator, list_types), repeat)
+    timings["compile"], schema = measure(lambda: CompiledSchema(schema_content), repeat)
+    validator = YAMLValidator(schema, resource_content, exclusions_content)
+
+    def evaluate_rules():
+        # Resolved references are cached by the validator, so every repeat starts without them
+        validator.references = ReferenceResolver(validator.resource_handler.flat_yml)
+        return list(validator._generate_issues())
+
+    timings["rules"], issues = measure(evaluate_rules, repeat)
+    timings["reporting"], _ = measure(
+        lambda: json.dumps([validator._update_severity(issue) for issue in issues], default=str), repeat)
+    timings["total"], _ = measure(
+        lambda: YAMLValidator(schema_content, resource_content, exclusions_content).get_validation_issues(), repeat)
+    return timings, len(issues)
+
+
+def print_results(results, baseline):
+    header = "{0:<12} {1:<10} {2:>12}".format("scenario", "phase", "time [ms]")
+    print(header + (" {0:>12} {1:>8}".format("base [ms]", "ratio") if baseline else ""))
+    for scenario, result in results.items():
+        for phase in PHASES:
+            elapsed = result["timings"][phase] * 1000
+            line = "{0:<12} {1:<10} {2:12.1f}".format(scenario, phase, elapsed)
+            base = baseline.get(scenario, {}).get("timings", {}).get(phase) if baseline else None
+            if base:
+                line += " {0:12.1f} {1:8.2f}".format(base * 1000, elapsed / (base * 1000))
+            print(line)
+        print("{0:<12} {1:<10} {2:>12}".format(scenario, "issues", result["issues"]))
+
+
+def parse_arguments():
+    parser = ArgumentParser(description="Measures the validation phases on synthetic schemas and resources")
+    parser.add_argument("scenarios", nargs="*", help="Scenarios to run: {0} (default: all)".format(
+        ", ".join(SCENARIOS)))
+    parser.add_argument("--keys", type=int, help="Number of flat scalar keys of a custom scenario")
+    parser.add_argument("--list-length", type=int, default=0, help="Number of list items of a custom scenario")
+    parser.add_argument("--depth", type=int, default=2, help="Nesting depth of a custom scenario")
+    parser.add_argument("--rules", default=RULE_TOKENS,
+                        help="Rule tokens of a custom scenario, repeat a token to make it more frequent")
+    parser.add_argument("--references", type=float, default=0.0,
+                        help="Ratio of > and < rules referencing other keys in a custom scenario")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies key counts and list lengths")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Best of this many runs is reported")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--save", help="Saves the results to this JSON file")
+    parser.add_argument("--compare", help="Compares the results to this JSON file saved earlier")
+    return parser.parse_args()
+
+
+def get_scenarios(args):
+    if args.keys is not None:
+        return OrderedDict([("custom", {"keys": args.keys, "list_length": args.list_length, "depth": args.depth,
+                                        "rules": args.rules, "references": args.references})])
+    return OrderedDict((name, SCENARIOS[name]) for name in args.scenarios or SCENARIOS)
+
+
+def main():
+    args = parse_arguments()
+    results = OrderedDict()
+    for name, parameters in get_scenarios(args).items():
+        generator = ScenarioGenerator(parameters["rules"], parameters["references"], args.seed)
+        contents = generator.generate(int(parameters["keys"] * args.scale),
+                                      int(parameters["list_length"] * args.scale), parameters["depth"])
+        timings, issue_count = run_scenario(contents[0], contents[1], contents[2], args.repeat)
+        results[name] = {"parameters": parameters, "timings": timings, "issues": issue_count}
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as handler:
+            baseline = json.load(handler)["results"]
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, "w") as handler:
+            json.dump({"commit": get_commit(), "python": platform.python_version(), "scale": args.scale,
+                       "seed": args.seed, "results": results}, handler, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""Measures how scalar rule lookup scales with the number of flat keys.
+
+Usage: PYTHONPATH=. python benchmark/bench_schema_key_index.py [key_count ...]
+"""
+
+from __future__ import print_function
+import re
+import sys
+import timeit
+
+from yaml_rulz.validator import compile_schema
+from yaml_rulz.validator import YAMLValidator
+
+
+DEFAULT_KEY_COUNTS = [1000, 10000, 100000]
+LEGACY_SCAN_LIMIT = 5000
+
+
+def generate_yaml(key_count, value):
+    lines = ["---", "root:"]
+    for section in range(key_count // 100 + 1):
+        lines.append("  section_{0}:".format(section))
+        for key in range(min(100, key_count - section * 100)):
+            lines.append("    key_{0}: {1}".format(key, value))
+    return "\n".join(lines)
+
+
+def legacy_regexp_scan(validator):
+    # The pre-index lookup: every resource key mask is matched against every schema key
+    for resource_key in validator.resource_handler.scalars:
+        key_mask = validator.resource_handler.list_handler.get_key_mask(resource_key)
+        for schema_key in validator.schema.scalars:
+            if re.match(key_mask + "$", schema_key):
+                break
+
+
+def indexed_lookup(validator):
+    for resource_key in validator.resource_handler.scalars:
+        validator.schema.scalar_index.get(validator.resource_handler.list_handler.get_key_mask(resource_key))
+
+
+def main(key_counts):
+    print("{0:>10} {1:>14} {2:>14}".format("keys", "indexed [s]", "regexp scan [s]"))
+    for key_count in key_counts:
+        schema = compile_schema(generate_yaml(key_count, '"~ ^value$"'))
+        validator = YAMLValidator(schema, generate_yaml(key_count, "value"))
+        indexed = min(timeit.repeat(lambda: indexed_lookup(validator), number=1, repeat=3))
+        if key_count <= LEGACY_SCAN_LIMIT:
+            legacy = "{0:14.4f}".format(min(timeit.repeat(lambda: legacy_regexp_scan(validator), number=1, repeat=1)))
+        else:
+            legacy = "{0:>14}".format("skipped")
+        print("{0:>10} {1:14.4f} {2}".format(key_count, indexed, legacy))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_KEY_COUNTS)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""Measures the start-up of the command line tool in its different modes.
+
+Every mode runs the command line tool on a small schema and resource in a new interpreter with -X importtime (Python
+3.7+), the best of the repeats is reported: wall time, total import time and the number of imported modules. A mode
+fails if it imports any of the modules it should not need, e.g. PyYAML for a cached result or prettytable in raw
+mode, or if its import time is above --max-import-ms, so the script can guard the start-up in CI.
+
+Usage: PYTHONPATH=. python benchmark/bench_startup.py [mode ...] [--repeat 5] [--max-import-ms 50] [--verbose]
+"""
+
+from __future__ import print_function
+from argparse import ArgumentParser
+from collections import OrderedDict
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+DEFAULT_REPEAT = 5
+SCHEMA_CONTENT = """
+---
+name: "~ [a-z]+"
+port: "@ num | < 65536"
+hosts:
+  - address: "@ ipv4"
+    enabled: "? true"
+"""
+RESOURCE_CONTENT = """
+---
+name: server
+port: 8080
+hosts:
+  - address: 10.0.0.1
+    enabled: true
+  - address: 10.0.0.2
+    enabled: true
+"""
+HEAVY_MODULES = ["yaml", "prettytable", "json", "multiprocessing", "socket", "tempfile", "asyncio"]
+# Arguments of the command line tool and the modules the mode must not import
+MODES = OrderedDict([
+    ("import", {"args": None, "forbidden": HEAVY_MODULES}),
+    ("help", {"args": ["--help"], "forbidden": HEAVY_MODULES}),
+    ("table", {"args": [], "forbidden": ["json", "multiprocessing", "socket", "tempfile", "asyncio"]}),
+    ("raw", {"args": ["--raw"], "forbidden": ["prettytable", "multiprocessing", "socket", "tempfile", "asyncio"]}),
+    ("cached", {"args": ["--raw", "--cache-dir", "{cache_dir}"],
+                "forbidden": ["yaml", "prettytable", "multiprocessing", "socket", "asyncio"]}),
+])
+RE_IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def parse_import_times(stderr):
+    # Returns the self times of the imported modules in microseconds, nested modules included
+    modules = OrderedDict()
+    for line in stderr.splitlines():
+        match = RE_IMPORT_TIME.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(1))
+    return modules
+
+
+def run_mode(arguments, directory):
+    if arguments is None:
+        command = [sys.executable, "-X", "importtime", "-c", "import yaml_rulz.cli"]
+    else:
+        command = [sys.executable, "-X", "importtime", "-m", "yaml_rulz.cli",
+                   os.path.join(directory, "schema.yml"), os.path.join(directory, "resource.yml")]
+        command += [argument.format(cache_dir=os.path.join(directory, "cache")) for argument in arguments]
+    start = time.time()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    _, stderr = process.communicate()
+    elapsed = time.time() - start
+    if process.returncode not in (0, 1):
+        raise RuntimeError("{0} failed:\n{1}".format(" ".join(command), stderr))
+    return elapsed, parse_import_times(stderr)
+
+
+def measure_mode(arguments, directory, repeat):
+    best = None
+    for _ in range(repeat):
+        elapsed, modules = run_mode(arguments, directory)
+        if best is None or elapsed < best[0]:
+            best = elapsed, modules
+    return best
+
+
+def get_top_level_modules(modules):
+    return set(module.split(".")[0] for module in modules)
+
+
+def print_results(results, verbose):
+    print("{0:<8} {1:>10} {2:>12} {3:>8}  {4}".format("mode", "wall [ms]", "import [ms]", "modules", "unexpected"))
+    for mode, (elapsed, modules, unexpected) in results.items():
+        import_time = sum(modules.values()) / 1000.0
+        print("{0:<8} {1:10.1f} {2:12.1f} {3:8}  {4}".format(mode, elapsed * 1000, import_time, len(modules),
+                                                             ", ".join(unexpected) or "-"))
+        if verbose:
+            slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+            for module, self_time in slowest:
+                print("    {0:<40} {1:8.1f}".format(module, self_time / 1000.0))
+
+
+def parse_arguments():
+    parser = ArgumentParser(description="Measures the start-up of the command line tool in its different modes")
+    parser.add_argument("modes", nargs="*", help="Modes to run: {0} (default: all)".format(", ".join(MODES)))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Best of this many runs is reported")
+    parser.add_argument("--max-import-ms", type=float, help="Fails if the import time of a mode is above this")
+    parser.add_argument("--verbose", action="store_true", help="Prints the 10 slowest imports of every mode")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    if sys.version_info < (3, 7):
+        sys.exit("-X importtime needs Python 3.7 or later")
+    directory = tempfile.mkdtemp()
+    try:
+        for filename, content in (("schema.yml", SCHEMA_CONTENT), ("resource.yml", RESOURCE_CONTENT)):
+            with open(os.path.join(directory, filename), "w") as handler:
+                handler.write(content)
+        # Fills the cache for the cached mode
+        run_mode(MODES["cached"]["args"], directory)
+        results = OrderedDict()
+        for mode in args.modes or MODES:
+            elapsed, modules = measure_mode(MODES[mode]["args"], directory, args.repeat)
+            unexpected = sorted(get_top_level_modules(modules).intersection(MODES[mode]["forbidden"]))
+            results[mode] = elapsed, modules, unexpected
+    finally:
+        shutil.rmtree(directory)
+    print_results(results, args.verbose)
+    failed = [mode for mode, (_, modules, unexpected) in results.items()
+              if unexpected or args.max_import_ms and sum(modules.values()) / 1000.0 > args.max_import_ms]
+    if failed:
+        sys.exit("Start-up regression in: {0}".format(", ".join(failed)))
+
+
+if __name__ == "__main__":
+    main()
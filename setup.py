@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import re
+
 from setuptools import setup
 
 
+with open("yaml_rulz/__init__.py") as handler:
+    VERSION = re.search(r'^__version__ = "(.*)"$', handler.read(), re.MULTILINE).group(1)
+
 setup(
     name="yaml_rulz",
-    version="0.0.1",
+    version=VERSION,
     description="A YAML validator",
     license="MIT",
     author="Milan Boleradszki",
@@ -0,0 +1,14 @@
+import shutil
+import tempfile
+from unittest import TestCase
+
+
+class TemporaryDirectoryTestCase(TestCase):
+
+    # Every test gets an empty directory in self.directory, which is removed with its content afterwards
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
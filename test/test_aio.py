@@ -0,0 +1,133 @@
+import sys
+import threading
+import time
+from unittest import skipIf
+from unittest import TestCase
+
+from yaml_rulz.validator import CompiledSchema
+from yaml_rulz.validator import YAMLValidator
+
+if sys.version_info >= (3, 5):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from yaml_rulz.aio import ChunkedValidator
+    from yaml_rulz.aio import validate_async
+    from yaml_rulz.aio import validate_many_async
+
+
+SCHEMA_CONTENT = r"""
+---
+root:
+  key_a: "~ exactly this"
+  key_b: "@ num | > 15"
+  key_c: "@ num | < root:key_b"
+  list:
+    - name: "~ item"
+      port: "@ num | > 1023"
+"""
+RESOURCE_CONTENT = r"""
+---
+root:
+  key_a: exactly this
+  key_b: 6
+  key_c: 10
+  extra: 1
+  list:
+    - name: item_a
+      port: 8080
+    - name: other
+      port: 80
+"""
+EXCLUSIONS_CONTENT = r"""
+---
+- root:key_b
+"""
+
+
+@skipIf(sys.version_info < (3, 5), "asyncio API requires Python 3.5")
+class TestAsyncValidation(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.loop.close()
+
+    def test_issues_are_the_same_as_synchronous(self):
+        for chunk_size in (1, 2, 1000):
+            for exclusions, skip_excluded in ((None, False), (EXCLUSIONS_CONTENT, False), (EXCLUSIONS_CONTENT, True)):
+                expected = YAMLValidator(SCHEMA_CONTENT, RESOURCE_CONTENT, exclusions,
+                                         skip_excluded=skip_excluded).get_validation_issues()
+                actual = self.__run(validate_async(SCHEMA_CONTENT, RESOURCE_CONTENT, exclusions,
+                                                   skip_excluded=skip_excluded, executor=self.executor,
+                                                   chunk_size=chunk_size))
+                self.assertEqual(expected, actual)
+
+    def test_max_errors_stops_validation(self):
+        has_errors, issues = self.__run(validate_async(SCHEMA_CONTENT, RESOURCE_CONTENT, max_errors=2,
+                                                       chunk_size=1))
+        self.assertTrue(has_errors)
+        self.assertEqual(2, len(issues))
+
+    def test_validation_is_split_into_chunks(self):
+        validator = ChunkedValidator(SCHEMA_CONTENT, RESOURCE_CONTENT)
+        # Missing resource and missing schema scalars, 5 scalars and 2 list groups
+        self.assertEqual(2 + 3 + 1, len(list(validator.iter_issue_chunks(chunk_size=2))))
+
+    def test_timeout(self):
+        blocker = threading.Event()
+        schema = CompiledSchema(SCHEMA_CONTENT)
+        self.executor.submit(blocker.wait)
+        self.executor.submit(blocker.wait)
+        try:
+            with self.assertRaises(asyncio.TimeoutError):
+                self.__run(validate_async(schema, RESOURCE_CONTENT, executor=self.executor, timeout=0.05))
+        finally:
+            blocker.set()
+
+    def test_cancellation(self):
+        blocker = threading.Event()
+        self.executor.submit(blocker.wait)
+        self.executor.submit(blocker.wait)
+        task = self.loop.create_task(validate_async(SCHEMA_CONTENT, RESOURCE_CONTENT, executor=self.executor))
+        self.loop.call_later(0.05, task.cancel)
+        try:
+            with self.assertRaises(asyncio.CancelledError):
+                self.loop.run_until_complete(task)
+        finally:
+            blocker.set()
+
+    def test_validate_many_reports_errors_in_order(self):
+        resources = [RESOURCE_CONTENT, "root: [", RESOURCE_CONTENT.replace("key_b: 6", "key_b: 16")]
+        results = self.__run(validate_many_async(SCHEMA_CONTENT, resources, executor=self.executor, concurrency=2))
+        self.assertEqual(3, len(results))
+        self.assertEqual(YAMLValidator(SCHEMA_CONTENT, resources[0]).get_validation_issues(), tuple(results[0]))
+        self.assertTrue(results[1][0])
+        self.assertEqual(1, len(results[1][1]))
+        self.assertEqual(YAMLValidator(SCHEMA_CONTENT, resources[2]).get_validation_issues(), tuple(results[2]))
+
+    def test_validate_many_is_bounded(self):
+        active = []
+        peak = []
+        validate = ChunkedValidator.run_chunk
+
+        def run_chunk(validator, chunk):
+            active.append(validator)
+            peak.append(len(set(active)))
+            time.sleep(0.01)
+            active.remove(validator)
+            return validate(validator, chunk)
+
+        ChunkedValidator.run_chunk = run_chunk
+        try:
+            with ThreadPoolExecutor(8) as executor:
+                self.__run(validate_many_async(SCHEMA_CONTENT, [RESOURCE_CONTENT] * 6, executor=executor,
+                                               concurrency=2))
+        finally:
+            ChunkedValidator.run_chunk = validate
+        self.assertLessEqual(max(peak), 2)
+
+    def __run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
@@ -0,0 +1,81 @@
+import os
+
+try:
+    from mock import patch
+except ImportError:
+    from unittest.mock import patch
+
+from yaml_rulz.batch import validate_files
+
+from .helpers import TemporaryDirectoryTestCase
+
+
+SCHEMA_CONTENT = r"""
+---
+root:
+  key_a: "~ exactly this"
+  key_b: "@ num | > 15"
+"""
+
+RESOURCES = {
+    "ok.yml": "root:\n  key_a: exactly this\n  key_b: 16\n",
+    "excluded.yml": "root:\n  key_a: exactly that\n  key_b: 16\n",
+    "failing.yml": "root:\n  key_a: exactly this\n  key_b: 6\n",
+    "broken.yml": "root:\n  key: value\n   other_key: other_value\n",
+}
+
+EXCLUSIONS = r"""
+root:key_a
+"""
+
+
+class TestBatch(TemporaryDirectoryTestCase):
+
+    def setUp(self):
+        super(TestBatch, self).setUp()
+        self.resource_files = []
+        for filename in sorted(RESOURCES):
+            path = os.path.join(self.directory, filename)
+            with open(path, "w") as handler:
+                handler.write(RESOURCES[filename])
+            self.resource_files.append(path)
+        self.resource_files.append(os.path.join(self.directory, "missing.yml"))
+
+    def test_batch_results_are_in_input_order(self):
+        results = validate_files(SCHEMA_CONTENT, self.resource_files, EXCLUSIONS)
+        self.assertEqual(self.resource_files, [resource_file for resource_file, _, _ in results])
+        self.assertEqual([True, False, True, False, True], [has_errors for _, has_errors, _ in results])
+        self.assertEqual(1, len(results[1][2]))
+
+    def test_parallel_batch_matches_sequential_batch(self):
+        self.assertEqual(validate_files(SCHEMA_CONTENT, self.resource_files, EXCLUSIONS),
+                         validate_files(SCHEMA_CONTENT, self.resource_files, EXCLUSIONS, jobs=2))
+
+    def test_excluded_issues_can_be_skipped(self):
+        results = validate_files(SCHEMA_CONTENT, self.resource_files, EXCLUSIONS, skip_excluded=True)
+        self.assertEqual([], results[1][2])
+
+    def test_streaming_batch_matches_batch(self):
+        # Parser errors of streamed resources refer to the file name instead of "<unicode string>"
+        self.assertEqual([(resource_file, has_errors, len(issues)) for resource_file, has_errors, issues
+                          in validate_files(SCHEMA_CONTENT, self.resource_files, EXCLUSIONS)],
+                         [(resource_file, has_errors, len(issues)) for resource_file, has_errors, issues
+                          in validate_files(SCHEMA_CONTENT, self.resource_files, EXCLUSIONS, stream=True)])
+
+    def test_cached_results_skip_validation(self):
+        cache_dir = os.path.join(self.directory, "cache")
+        expected = validate_files(SCHEMA_CONTENT, self.resource_files, EXCLUSIONS, cache_dir=cache_dir)
+        with patch("yaml_rulz.batch.YAMLValidator") as validator_mock:
+            actual = validate_files(SCHEMA_CONTENT, self.resource_files, EXCLUSIONS, cache_dir=cache_dir)
+        # Only the broken resource is validated again, since errors are not cached and the missing one has no digest
+        self.assertEqual(expected[1:], actual[1:])
+        self.assertEqual(1, validator_mock.call_count)
+
+    def test_documents_of_resources_are_validated_separately(self):
+        path = os.path.join(self.directory, "documents.yml")
+        with open(path, "w") as handler:
+            handler.write("---\n" + RESOURCES["ok.yml"] + "---\n" + RESOURCES["failing.yml"])
+        results = validate_files(SCHEMA_CONTENT, [path, self.resource_files[2]], documents=True)
+        self.assertTrue(results[0][1])
+        self.assertEqual([1], [issue["document"] for issue in results[0][2]])
+        self.assertEqual([0], [issue["document"] for issue in results[1][2]])
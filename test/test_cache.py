@@ -0,0 +1,90 @@
+import json
+import os
+
+try:
+    from mock import patch
+except ImportError:
+    from unittest.mock import patch
+
+from yaml_rulz.cache import get_file_digest
+from yaml_rulz.cache import get_namespace
+from yaml_rulz.cache import ResultCache
+
+from .helpers import TemporaryDirectoryTestCase
+
+
+ISSUES = [
+    {
+        "criterion": "1500",
+        "message": "Value must be less than criterion",
+        "ref": False,
+        "resource": "root:less_than_rule",
+        "severity": "Error",
+        "schema": "root:less_than_rule",
+        "value": 1500,
+    },
+]
+
+
+class TestResultCache(TemporaryDirectoryTestCase):
+
+    def setUp(self):
+        super(TestResultCache, self).setUp()
+        self.cache = ResultCache(os.path.join(self.directory, "cache"))
+
+    def test_missing_entry_returns_none(self):
+        self.assertIsNone(self.cache.get(ResultCache.get_key("schema", "resource")))
+
+    def test_stored_result_is_returned(self):
+        key = ResultCache.get_key("schema", "resource")
+        self.cache.set(key, (True, ISSUES))
+        self.assertEqual((True, ISSUES), self.cache.get(key))
+
+    def test_key_depends_on_every_part(self):
+        self.assertNotEqual(ResultCache.get_key("ab", "c"), ResultCache.get_key("a", "bc"))
+        self.assertNotEqual(get_namespace("schema"), get_namespace("schema", max_errors=1))
+        self.assertNotEqual(get_namespace("schema"), get_namespace("schema", stream=True))
+
+    def test_resource_key_depends_on_file_content(self):
+        path = os.path.join(self.directory, "resource.yml")
+        keys = []
+        for content in ("key: a\n", "key: b\n"):
+            with open(path, "w") as handler:
+                handler.write(content)
+            keys.append(self.cache.get_resource_key("namespace", path))
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertEqual(64, len(get_file_digest(path)))
+
+    def test_unserializable_result_is_not_cached(self):
+        key = ResultCache.get_key("schema", "resource")
+        self.cache.set(key, (True, [{"value": object()}]))
+        self.assertIsNone(self.cache.get(key))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        keys = [ResultCache.get_key(index) for index in range(3)]
+        for index, key in enumerate(keys):
+            self.cache.set(key, (False, []))
+            # Modification times are the recency of the entries
+            os.utime(self.cache._get_path(key), (index, index))  # pylint: disable = protected-access
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.cache.max_size = 3 * os.path.getsize(self.cache._get_path(keys[0]))  # pylint: disable = protected-access
+        self.cache.set(ResultCache.get_key(3), (False, []))
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNone(self.cache.get(keys[2]))
+
+    def test_directory_is_only_scanned_when_the_cache_is_full(self):
+        entry_size = len(json.dumps([False, []]))
+        self.cache.max_size = 100 * entry_size
+        with patch("yaml_rulz.cache.os.listdir", side_effect=os.listdir) as listdir_mock:
+            for index in range(200):
+                self.cache.set(ResultCache.get_key(index), (False, []))
+            # The first write and every write above the maximum size after evicting a quarter of the entries
+            self.assertEqual(5, listdir_mock.call_count)
+        self.assertEqual(96, len(os.listdir(self.cache.directory)))
+
+    def test_clear_removes_every_entry(self):
+        key = ResultCache.get_key("schema", "resource")
+        self.cache.set(key, (False, []))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(key))
@@ -3,6 +3,12 @@ try:
 except ImportError:
     from io import StringIO
 
+from argparse import ArgumentParser
+import json
+import socket
+import subprocess
+import sys
+from unittest import skipIf
 from unittest import TestCase
 
 try:
@@ -14,6 +20,7 @@ except ImportError:
 
 from yaml_rulz.cli import main
 from yaml_rulz.errors import YAMLHandlerError
+from yaml_rulz.yaml_handler import LOADERS
 
 
 DUMMY_FILE_CONTENT = "dummy"
@@ -47,38 +54,73 @@ ISSUE = [
 ]
 
 
-class ArgsNameSpace(object):
+class ArgsNameSpace(object):  # pylint: disable = too-many-instance-attributes
 
     schema = None
     resource = None
     exclusions = None
     raw = None
+    jobs = None
+    loader = None
+    max_errors = None
+    fail_fast = None
+    skip_excluded = None
+    stream = None
+    cache_dir = None
+    watch = None
+    socket = None
+    stats = None
+    profile = None
+    documents = None
+    compact = None
 
-    def __init__(self, schema, resource, exclusions=None, raw=False):
+    def __init__(self, schema, resource,  # pylint: disable = too-many-arguments, too-many-locals
+                 exclusions=None, raw=False, jobs=1, loader=None, max_errors=None, fail_fast=False,
+                 skip_excluded=False, stream=False, cache_dir=None, watch=False, socket=None, stats=False,
+                 profile=False, documents=False, compact=False):
         self.schema = schema
-        self.resource = resource
+        self.resource = resource if isinstance(resource, list) else [resource]
         self.exclusions = exclusions
         self.raw = raw
+        self.jobs = jobs
+        self.loader = loader
+        self.max_errors = max_errors
+        self.fail_fast = fail_fast
+        self.skip_excluded = skip_excluded
+        self.stream = stream
+        self.cache_dir = cache_dir
+        self.watch = watch
+        self.socket = socket
+        self.stats = stats
+        self.profile = profile
+        self.documents = documents
+        self.compact = compact
 
 
 class TestCLI(TestCase):
-    # pylint: disable = no-member, too-many-instance-attributes
+    # pylint: disable = no-member, too-many-instance-attributes, too-many-public-methods
 
     def setUp(self):
         self.argparser_patcher = patch("yaml_rulz.cli.ArgumentParser")
         self.argparser_mock = self.argparser_patcher.start()
-        self.validator_patcher = patch("yaml_rulz.cli.YAMLValidator")
+        self.validator_patcher = patch("yaml_rulz.validator.YAMLValidator")
         self.validator_mock = self.validator_patcher.start()
         self.stdout_patcher = patch("sys.stdout", new_callable=StringIO)
         self.stdout_mock = self.stdout_patcher.start()
         self.file_open_patcher = patch("yaml_rulz.cli.open", mock_open(read_data=DUMMY_FILE_CONTENT))
         self.file_open_mock = self.file_open_patcher.start()
+        self.batch_patcher = patch("yaml_rulz.batch.validate_files")
+        self.batch_mock = self.batch_patcher.start()
+        self.streaming_validator_patcher = patch("yaml_rulz.streaming.StreamingValidator")
+        self.streaming_validator_mock = self.streaming_validator_patcher.start()
 
     def tearDown(self):
         self.argparser_patcher.stop()
         self.validator_patcher.stop()
         self.stdout_patcher.stop()
         self.file_open_patcher.stop()
+        self.batch_patcher.stop()
+        self.streaming_validator_patcher.stop()
 
     def test_cli_prints_empty_table_when_no_issues(self):
         self.__setup_mocks(ArgsNameSpace("schema", "resource"), (False, []))
@@ -90,6 +132,18 @@ class TestCLI(TestCase):
         main()
         self.assertEqual(EMPTY_RAW, self.stdout_mock.getvalue())
 
+    def test_cli_prints_document_of_issues(self):
+        self.__setup_mocks(ArgsNameSpace("schema", "resource", documents=True), (False, []))
+        issue = dict(ISSUE[0], document=3)
+        with patch("yaml_rulz.documents.get_document_validation_issues") as documents_mock:
+            documents_mock.return_value = (True, [issue])
+            self.assertRaises(SystemExit, main)
+        self.validator_mock.assert_not_called()
+        self.assertEqual(DUMMY_FILE_CONTENT, documents_mock.call_args[0][0])
+        lines = self.stdout_mock.getvalue().splitlines()
+        self.assertTrue(lines[1].startswith("| Document | Severity |"))
+        self.assertTrue(lines[3].startswith("| 3        | Error    |"))
+
     def test_cli_prints_issues_in_table(self):
         self.__setup_mocks(ArgsNameSpace("schema", "resource"), (True, ISSUE))
         self.assertRaises(SystemExit, main)
@@ -103,6 +157,49 @@ class TestCLI(TestCase):
             sorted([line.strip(", ") for line in self.stdout_mock.getvalue().splitlines()])
         )
 
+    def test_cli_validates_list_groups_in_parallel_with_jobs(self):
+        self.__setup_mocks(ArgsNameSpace("schema", "resource", jobs=2), (False, []))
+        with patch("yaml_rulz.parallel.ParallelValidator") as parallel_validator_mock:
+            parallel_validator_mock.return_value.get_validation_issues.return_value = (False, [])
+            main()
+        parallel_validator_mock.assert_called_once_with(DUMMY_FILE_CONTENT, DUMMY_FILE_CONTENT, None, None, False, 2,
+                                                        stats=None, compact=False)
+        self.validator_mock.assert_not_called()
+        self.assertEqual(EMPTY_TABLE, self.stdout_mock.getvalue())
+
+    def test_cli_passes_selected_loader_to_validator(self):
+        self.__setup_mocks(ArgsNameSpace("schema", "resource", loader="safe"), (False, []))
+        main()
+        self.validator_mock.assert_called_once_with(DUMMY_FILE_CONTENT, DUMMY_FILE_CONTENT, None, LOADERS["safe"],
+                                                    False, None, False)
+
+    def test_cli_passes_compact_to_validator(self):
+        self.__setup_mocks(ArgsNameSpace("schema", "resource", compact=True), (False, []))
+        main()
+        self.assertTrue(self.validator_mock.call_args[0][6])
+
+    def test_cli_prints_stats_to_stderr(self):
+        self.__setup_mocks(ArgsNameSpace("schema", "resource", profile=True), (False, []))
+        with patch("sys.stderr", new_callable=StringIO) as stderr_mock:
+            main()
+        stats = self.validator_mock.call_args[0][5]
+        self.assertTrue(stats.profile)
+        self.assertEqual(EMPTY_TABLE, self.stdout_mock.getvalue())
+        self.assertIn("Phase", stderr_mock.getvalue())
+        self.assertIn("Rule evaluations:", stderr_mock.getvalue())
+
+    def test_cli_prints_raw_stats_to_stderr(self):
+        self.__setup_mocks(ArgsNameSpace("schema", "resource", raw=True, stats=True), (False, []))
+        with patch("sys.stderr", new_callable=StringIO) as stderr_mock:
+            main()
+        self.assertFalse(self.validator_mock.call_args[0][5].profile)
+        self.assertEqual([], json.loads(stderr_mock.getvalue())["slowest_rules"])
+
+    def test_cli_fail_fast_stops_at_first_error(self):
+        self.__setup_mocks(ArgsNameSpace("schema", "resource", max_errors=5, fail_fast=True), (True, ISSUE))
+        self.assertRaises(SystemExit, main)
+        self.validator_mock.return_value.get_validation_issues.assert_called_once_with(1)
+
     def test_cli_handles_validator_exceptions(self):
         self.validator_mock.side_effect = YAMLHandlerError
         self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", "resource")
@@ -110,10 +207,139 @@ class TestCLI(TestCase):
         self.assertFalse(self.validator_mock.return_value.get_validation_issues.called)
 
     def test_cli_handles_file_io_errors(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", "resource")
         self.file_open_mock.side_effect = IOError
         self.assertRaises(SystemExit, main)
         self.assertFalse(self.validator_mock.return_value.get_validation_issues.called)
 
+    def test_cli_streams_resource_file_to_streaming_validator(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", "resource", stream=True)
+        self.streaming_validator_mock.return_value.get_validation_issues.return_value = (False, [])
+        main()
+        self.streaming_validator_mock.assert_called_once_with(DUMMY_FILE_CONTENT, "resource", None, None, False, None)
+        self.assertFalse(self.validator_mock.called)
+
+    def test_cli_handles_streaming_validation_errors(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", "resource", stream=True)
+        self.streaming_validator_mock.return_value.get_validation_issues.side_effect = YAMLHandlerError
+        self.assertRaises(SystemExit, main)
+
+    def test_cli_returns_cached_result_without_validation(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", "resource",
+                                                                                 cache_dir="cache")
+        with patch("yaml_rulz.cache.ResultCache") as cache_mock:
+            cache_mock.return_value.get.return_value = (True, ISSUE)
+            self.assertRaises(SystemExit, main)
+        cache_mock.assert_called_once_with("cache")
+        self.assertFalse(self.validator_mock.called)
+        self.assertEqual(TABLE_WITH_ISSUE, self.stdout_mock.getvalue())
+
+    def test_cli_watch_prints_changes_until_interrupted(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", "resource", watch=True,
+                                                                                 fail_fast=True)
+
+        def run(callback):
+            callback([("resource", ISSUE, [])])
+            raise KeyboardInterrupt
+
+        with patch("yaml_rulz.watch.ValidationWatcher") as watcher_mock:
+            watcher_mock.return_value.run.side_effect = run
+            main()
+        watcher_mock.assert_called_once_with("schema", ["resource"], None, None, False, 1, False)
+        output = self.stdout_mock.getvalue()
+        self.assertIn("| +      | resource | Error    | Value must be less than criterion |", output)
+        self.assertTrue(output.endswith("1 new and 0 resolved issues\n"))
+        self.assertFalse(self.validator_mock.called)
+
+    def test_cli_prints_results_of_validation_server(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", "resource",
+                                                                                 socket="socket")
+        with patch("yaml_rulz.client.send_request") as send_request_mock:
+            send_request_mock.return_value = {"results": [{"file": "/resource", "has_errors": True,
+                                                           "issues": ISSUE}]}
+            self.assertRaises(SystemExit, main)
+        self.assertEqual("socket", send_request_mock.call_args[0][1])
+        self.assertFalse(self.validator_mock.called)
+        self.assertEqual(TABLE_WITH_ISSUE, self.stdout_mock.getvalue())
+
+    def test_cli_prints_resource_errors_of_validation_server(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", "resource",
+                                                                                 socket="socket")
+        with patch("yaml_rulz.client.send_request") as send_request_mock:
+            send_request_mock.return_value = {"results": [{"file": "/resource", "has_errors": True, "error": "missing",
+                                                           "issues": [{"message": "missing"}]}]}
+            self.assertRaises(SystemExit, main)
+        self.assertEqual("missing\n", self.stdout_mock.getvalue())
+
+    def test_cli_falls_back_to_validation_after_server_timeout(self):
+        self.__setup_mocks(ArgsNameSpace("schema", "resource", socket="socket"), (False, []))
+        with patch("yaml_rulz.client.send_request") as send_request_mock:
+            send_request_mock.side_effect = socket.timeout
+            main()
+        self.assertTrue(self.validator_mock.called)
+        self.assertEqual(EMPTY_TABLE, self.stdout_mock.getvalue())
+
+    def test_cli_falls_back_to_validation_without_server(self):
+        self.__setup_mocks(ArgsNameSpace("schema", "resource", socket="socket"), (False, []))
+        with patch("yaml_rulz.client.send_request") as send_request_mock:
+            send_request_mock.side_effect = socket.error
+            main()
+        self.assertTrue(self.validator_mock.called)
+        self.assertEqual(EMPTY_TABLE, self.stdout_mock.getvalue())
+
+    def test_cli_validates_multiple_resources_in_batch(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", ["res_a", "res_b"], jobs=2)
+        self.batch_mock.return_value = [("res_a", False, []), ("res_b", True, ISSUE)]
+        self.assertRaises(SystemExit, main)
+        self.batch_mock.assert_called_once_with(DUMMY_FILE_CONTENT, ["res_a", "res_b"], None, 2, None, None, False,
+                                                False, None, False)
+        self.assertFalse(self.validator_mock.called)
+        output = self.stdout_mock.getvalue()
+        self.assertIn("| res_b | Error    | Value must be less than criterion |", output)
+        self.assertTrue(output.endswith("1 of 2 resource files failed validation\n"))
+
+    def test_cli_prints_batch_results_in_raw_format(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", ["res_a", "res_b"],
+                                                                                 raw=True)
+        self.batch_mock.return_value = [("res_a", False, []), ("res_b", False, [])]
+        main()
+        self.assertEqual([{"file": "res_a", "has_errors": False, "issues": []},
+                          {"file": "res_b", "has_errors": False, "issues": []}],
+                         json.loads(self.stdout_mock.getvalue()))
+
+    def test_cli_handles_batch_validator_exceptions(self):
+        self.argparser_mock.return_value.parse_args.return_value = ArgsNameSpace("schema", ["res_a", "res_b"])
+        self.batch_mock.side_effect = YAMLHandlerError
+        self.assertRaises(SystemExit, main)
+
+    def test_cli_rejects_options_not_supported_in_watch_mode(self):
+        for option in ("--stream", "--documents", "--cache-dir=cache", "--socket", "--stats", "--jobs=4"):
+            with patch("yaml_rulz.cli.ArgumentParser", ArgumentParser), patch("sys.stderr", new_callable=StringIO), \
+                    patch("sys.argv", ["yaml_rulz", "schema", "resource", "--watch", option]), \
+                    patch("yaml_rulz.watch.ValidationWatcher") as watcher_mock:
+                self.assertRaises(SystemExit, main)
+                self.assertIn("not allowed with argument " + option.split("=")[0], sys.stderr.getvalue())
+            watcher_mock.assert_not_called()
+
+    def test_cli_rejects_negative_jobs(self):
+        with patch("yaml_rulz.cli.ArgumentParser", ArgumentParser), patch("sys.stderr", new_callable=StringIO), \
+                patch("sys.argv", ["yaml_rulz", "schema", "res_a", "res_b", "-j", "-1"]):
+            self.assertRaises(SystemExit, main)
+            self.assertIn("number of jobs must be 0 or more", sys.stderr.getvalue())
+        self.batch_mock.assert_not_called()
+
+    def test_cli_rejects_negative_max_errors(self):
+        with patch("yaml_rulz.cli.ArgumentParser", ArgumentParser), patch("sys.stderr", new_callable=StringIO), \
+                patch("sys.argv", ["yaml_rulz", "schema", "resource", "-m", "-1"]):
+            self.assertRaises(SystemExit, main)
+            self.assertIn("maximum number of errors must be 0 or more", sys.stderr.getvalue())
+        self.validator_mock.assert_not_called()
+
+    @skipIf(sys.version_info < (3, 7), "the package is imported lazily on Python 3.7 and later")
+    def test_cli_is_imported_without_yaml_and_prettytable(self):
+        code = "import sys, yaml_rulz.cli; print(sorted(set(['yaml', 'prettytable']).intersection(sys.modules)))"
+        self.assertEqual("[]", subprocess.check_output([sys.executable, "-c", code]).decode().strip())
+
     def __setup_mocks(self, args_ns, val_issues):
         self.argparser_mock.return_value.parse_args.return_value = args_ns
         self.validator_mock.return_value.get_validation_issues.return_value = val_issues
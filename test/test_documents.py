@@ -0,0 +1,63 @@
+import os
+
+from yaml_rulz.documents import get_document_validation_issues
+from yaml_rulz.documents import iter_documents
+from yaml_rulz.documents import validate_documents
+from yaml_rulz.errors import YAMLHandlerError
+from yaml_rulz.validator import YAMLValidator
+
+from .helpers import TemporaryDirectoryTestCase
+
+
+SCHEMA_CONTENT = r"""
+---
+root:
+  key_a: "~ exactly this"
+  key_b: "@ num | > 15"
+  list:
+    - name: "~ item"
+"""
+DOCUMENTS = [
+    "root:\n  key_a: exactly this\n  key_b: 16\n  list:\n    - name: item_a\n",
+    "root:\n  key_a: exactly that\n  key_b: 6\n  list:\n    - name: other\n",
+    "root:\n  key_a: exactly this\n  key_b: 6\n  list: []\n",
+]
+STREAM = "---\n" + "---\n".join(DOCUMENTS) + "---\n"
+
+
+class TestDocuments(TemporaryDirectoryTestCase):
+
+    def test_every_document_is_validated_separately(self):
+        results = list(validate_documents(SCHEMA_CONTENT, STREAM))
+        self.assertEqual([0, 1, 2], [index for index, _, _ in results])
+        for index, has_errors, issues in results:
+            validator = YAMLValidator(SCHEMA_CONTENT, DOCUMENTS[index])
+            expected_has_errors, expected_issues = validator.get_validation_issues()
+            self.assertEqual(expected_has_errors, has_errors)
+            self.assertEqual([dict(issue, document=index) for issue in expected_issues], issues)
+
+    def test_parallel_validation_matches_sequential_validation(self):
+        self.assertEqual(list(validate_documents(SCHEMA_CONTENT, STREAM)),
+                         list(validate_documents(SCHEMA_CONTENT, STREAM, jobs=2)))
+
+    def test_empty_documents_are_skipped_but_counted(self):
+        self.assertEqual([0, 2], [index for index, _ in iter_documents("--- 1\n---\n--- 2\n")])
+
+    def test_max_errors_is_counted_over_the_stream(self):
+        has_errors, issues = get_document_validation_issues(SCHEMA_CONTENT, STREAM, max_errors=4)
+        self.assertTrue(has_errors)
+        self.assertEqual(4, len(issues))
+        self.assertEqual([1, 1, 1, 2], [issue["document"] for issue in issues])
+
+    def test_documents_are_read_from_a_file(self):
+        path = os.path.join(self.directory, "resource.yml")
+        with open(path, "w") as handler:
+            handler.write(STREAM)
+        with open(path, "r") as handler:
+            self.assertEqual(get_document_validation_issues(SCHEMA_CONTENT, STREAM),
+                             get_document_validation_issues(SCHEMA_CONTENT, handler))
+
+    def test_parsing_error_is_raised_after_the_previous_documents(self):
+        results = validate_documents(SCHEMA_CONTENT, DOCUMENTS[0] + "---\nroot: [\n")
+        self.assertEqual(0, next(results)[0])
+        self.assertRaises(YAMLHandlerError, next, results)
@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from yaml_rulz.exclusions import ExclusionMatcher
+
+
+class TestExclusionMatcher(TestCase):
+
+    def test_keys_are_matched_from_the_beginning(self):
+        matcher = ExclusionMatcher(["base:section_b", "base:section.*:location"])
+        self.assertTrue(matcher.is_excluded("base:section_b:name"))
+        self.assertTrue(matcher.is_excluded("base:section_a:location"))
+        self.assertFalse(matcher.is_excluded("base:section_a:name"))
+        self.assertFalse(matcher.is_excluded("other:base:section_b"))
+
+    def test_non_string_keys_are_never_excluded(self):
+        matcher = ExclusionMatcher([".*"])
+        self.assertFalse(matcher.is_excluded(None))
+        self.assertFalse(matcher.is_excluded([{"key": "value"}]))
+
+    def test_empty_exclusions_match_nothing(self):
+        self.assertFalse(ExclusionMatcher([]).is_excluded("base"))
+
+    def test_patterns_with_backreferences_are_matched_one_by_one(self):
+        matcher = ExclusionMatcher(["(a+):\\1", "b"])
+        self.assertTrue(matcher.is_excluded("aa:aa"))
+        self.assertFalse(matcher.is_excluded("aa:a:b"))
+        self.assertTrue(matcher.is_excluded("b:c"))
@@ -0,0 +1,63 @@
+from __future__ import division
+from unittest import TestCase
+
+from yaml_rulz.errors import RuleError
+from yaml_rulz.expression import evaluate_expression
+from yaml_rulz.expression import to_number
+
+
+VALID_EXPRESSIONS = [
+    "0",
+    "-20",
+    "+7",
+    "1.5",
+    ".5e2",
+    "90/10+1",
+    "(90/10+1)*20",
+    "1000 + 1000 / 2",
+    "2 ** 3 ** 2",
+    "-2 ** 2",
+    "2 ** -1",
+    "2 ** 2 ** 2 ** 2",
+    "(2 ** 64) ** 64",
+    "(0 ** 5000) ** 5000",
+    "((1 + 2) * (3 - 4)) / -5",
+]
+INVALID_EXPRESSIONS = [
+    "",
+    "not number",
+    "a124",
+    "__import__('os')",
+    "1 +",
+    "(1 + 2",
+    "1 + 2)",
+    "1 / 0",
+    "10 ** 10 ** 10",
+    "2 ** 2 ** 2 ** 2 ** 2",
+    "(9 ** 1024) ** 1024",
+    "((9 ** 1000) ** 1000) ** 1000",
+    "-(9 ** 1000) ** -1000",
+    "1e999 ** 2",
+    "1 % 2",
+]
+
+
+class TestExpression(TestCase):
+
+    def test_valid_expressions_are_evaluated_like_python(self):
+        for expression in VALID_EXPRESSIONS:
+            self.assertEqual(eval(expression), evaluate_expression(expression))
+
+    def test_invalid_expressions_raise_rule_error(self):
+        for expression in INVALID_EXPRESSIONS:
+            self.assertRaises(RuleError, evaluate_expression, expression)
+
+    def test_large_powers_are_rejected_before_they_are_computed(self):
+        for expression in ["(9 ** 1024) ** 1024", "((9 ** 1000) ** 1000) ** 1000", "9 ** 9 ** 9 ** 9"]:
+            self.assertRaises(RuleError, to_number, expression)
+        self.assertEqual(2 ** 4096, to_number("2 ** 4096"))
+
+    def test_numbers_are_not_evaluated(self):
+        self.assertEqual(1500, to_number(1500))
+        self.assertEqual(2.5, to_number(2.5))
+        self.assertEqual(100, to_number("100"))
@@ -0,0 +1,85 @@
+from unittest import TestCase
+
+try:
+    from mock import patch
+except ImportError:
+    from unittest.mock import patch
+
+from yaml_rulz.incremental import get_changed_keys
+from yaml_rulz.incremental import IncrementalValidator
+from yaml_rulz.validator import YAMLValidator
+
+
+SCHEMA_CONTENT = r"""
+---
+root:
+  name: "~ ^host\\d+$"
+  mtu: "> 1000 | < 9001"
+  min_mtu: "< root:mtu"
+  missing: "* whatever"
+  interfaces:
+    - name: "~ eth\\d+"
+      vlan_tag: "> 0 | < 4096 | ! .*:vlan_tag"
+"""
+RESOURCE_CONTENT = """
+---
+root:
+  name: host1
+  mtu: 1500
+  min_mtu: 1400
+  interfaces:
+    - name: eth0
+      vlan_tag: 10
+    - name: eth1
+      vlan_tag: 20
+    - name: eth2
+      vlan_tag: 30
+"""
+EXCLUSIONS = """
+root:missing
+"""
+
+
+class TestIncremental(TestCase):
+
+    def test_changed_keys_include_type_changes(self):
+        self.assertEqual({"b", "c", "d"}, get_changed_keys({"a": 1, "b": 1, "c": 1}, {"a": 1, "b": True, "d": 1}))
+
+    def test_update_matches_full_validation(self):
+        validator = IncrementalValidator(SCHEMA_CONTENT, RESOURCE_CONTENT, EXCLUSIONS)
+        validator.get_validation_issues()
+        for resource in (
+                RESOURCE_CONTENT.replace("mtu: 1500", "mtu: 1300"),
+                RESOURCE_CONTENT.replace("vlan_tag: 30", "vlan_tag: 10"),
+                RESOURCE_CONTENT.replace("name: host1", "name: host1\n  extra: 1").replace("name: eth2", "name: x"),
+                RESOURCE_CONTENT.replace("  min_mtu: 1400\n", ""),
+                RESOURCE_CONTENT.replace("root:\n", "root:\n  first: 1\n  mtu: 900\n").replace("  mtu: 1500\n", ""),
+                RESOURCE_CONTENT,
+        ):
+            expected = YAMLValidator(SCHEMA_CONTENT, resource, EXCLUSIONS).get_validation_issues()
+            actual = validator.update(resource)
+            self.assertEqual(expected, actual)
+
+    def test_update_lists_issues_in_the_order_of_full_validation(self):
+        validator = IncrementalValidator(SCHEMA_CONTENT, RESOURCE_CONTENT)
+        validator.get_validation_issues()
+        # New keys come before the kept ones in the resource
+        resource = RESOURCE_CONTENT.replace("root:\n", "root:\n  extra: 1\n  interfaces_b:\n    - name: x\n")
+        resource = resource.replace("name: host1", "name: h").replace("name: eth1", "name: y")
+        self.assertEqual(YAMLValidator(SCHEMA_CONTENT, resource).get_validation_issues(), validator.update(resource))
+        self.assertEqual(YAMLValidator(SCHEMA_CONTENT, resource).get_validation_issues(2),
+                         validator.update(resource, max_errors=2))
+
+    def test_update_validates_changed_and_referencing_keys_only(self):
+        # pylint: disable = protected-access
+        validator = IncrementalValidator(SCHEMA_CONTENT, RESOURCE_CONTENT)
+        validator.get_validation_issues()
+        resource = RESOURCE_CONTENT.replace("mtu: 1500", "mtu: 1300")
+        with patch.object(validator, "_validate_list_group") as group_mock:
+            with patch.object(validator, "_validate_rules", wraps=validator._validate_rules) as rules_mock:
+                _, issues = validator.update(resource)
+        self.assertFalse(group_mock.called)
+        # root:mtu itself and root:min_mtu, whose rule references it
+        self.assertEqual({"root:mtu", "root:min_mtu"},
+                         set(key for call in rules_mock.call_args_list for key in call[0][1]))
+        self.assertEqual(1, len([issue for issue in issues if issue["resource"] == "root:min_mtu"]))
@@ -78,3 +78,19 @@ class TestListHandler(TestCase):
     def test_list_handler_init(self):
         self.assertEqual(TEST_FLAT_YML_LIST_TYPES, self.handler.list_types)
         self.assertEqual(TEST_GROUPS, self.handler.groups)
+
+    def test_key_mask_wildcards_list_indices(self):
+        self.assertEqual(self.handler.get_key_mask("ericsson:shelf:1:blade:12:id"),
+                         self.handler.get_key_mask("ericsson:shelf:0:blade:3:id"))
+        self.assertNotEqual(self.handler.get_key_mask("ericsson:shelf:1:blade"),
+                            self.handler.get_key_mask("ericsson:shelf:1:blade:0"))
+
+    def test_groups_are_bucketed_by_parent_path(self):
+        flat_yml = {"root:items": []}
+        for index in range(500):
+            flat_yml["root:items:{0}:id".format(index)] = index
+            flat_yml["root:items:{0}:tags:0".format(index)] = "tag"
+        handler = ListHandler(flat_yml, ":")
+        self.assertEqual(1000, len(handler.groups))
+        self.assertEqual({"root:items:42:id": 42}, handler.groups["root:items:42"])
+        self.assertEqual({"root:items:42:tags:0": "tag"}, handler.groups["root:items:42:tags:0"])
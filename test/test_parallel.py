@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+from yaml_rulz.parallel import ParallelValidator
+from yaml_rulz.stats import ValidationStats
+from yaml_rulz.validator import YAMLValidator
+
+
+SCHEMA_CONTENT = r"""
+---
+hosts:
+  - name: ~ host\d+
+    port: "@ num | > 1023"
+    address: "@ ipv4"
+  - name: ~ switch\d+
+    port: "@ num | < 1024"
+"""
+EXCLUSIONS_CONTENT = r"""
+---
+- hosts:3
+"""
+
+
+def generate_resource(count):
+    lines = ["---", "hosts:"]
+    for index in range(count):
+        if index % 5 == 4:
+            lines.append("  - name: switch{0}\n    port: {1}".format(index, 22 + index))
+        else:
+            lines.append("  - name: host{0}\n    port: {1}\n    address: 10.0.0.{2}".format(index, 1000 + index, index))
+    return "\n".join(lines)
+
+
+class TestParallelValidator(TestCase):
+
+    def setUp(self):
+        self.resource = generate_resource(40)
+
+    def test_issues_are_the_same_for_any_number_of_workers(self):
+        expected = YAMLValidator(SCHEMA_CONTENT, self.resource, EXCLUSIONS_CONTENT).get_validation_issues()
+        self.assertTrue(expected[0])
+        for jobs, chunk_size in ((1, 1), (2, 1), (3, 7), (2, 100)):
+            validator = ParallelValidator(SCHEMA_CONTENT, self.resource, EXCLUSIONS_CONTENT, jobs=jobs,
+                                          chunk_size=chunk_size)
+            self.assertEqual(expected, validator.get_validation_issues())
+
+    def test_validation_stops_after_max_errors(self):
+        expected = YAMLValidator(SCHEMA_CONTENT, self.resource).get_validation_issues(max_errors=3)
+        validator = ParallelValidator(SCHEMA_CONTENT, self.resource, jobs=2, chunk_size=2)
+        self.assertEqual(expected, validator.get_validation_issues(max_errors=3))
+
+    def test_stats_of_workers_are_merged(self):
+        stats = ValidationStats()
+        ParallelValidator(SCHEMA_CONTENT, self.resource, jobs=2, chunk_size=3, stats=stats).get_validation_issues()
+        expected = ValidationStats()
+        YAMLValidator(SCHEMA_CONTENT, self.resource, stats=expected).get_validation_issues()
+        self.assertEqual({1: 40}, dict(stats.prototype_candidates))
+        self.assertEqual(expected.rule_evaluations, stats.rule_evaluations)
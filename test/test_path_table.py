@@ -0,0 +1,81 @@
+import pickle
+from unittest import TestCase
+
+from yaml_rulz.list_handler import ListHandler
+from yaml_rulz.path_table import PathTable
+
+
+TEST_ITEMS = [
+    ("root:name", "value", False),
+    ("root:list", [], False),
+    ("root:list:0:id", 1, True),
+    ("root:list:0:tags", [], True),
+    ("root:list:0:tags:0", "tag", True),
+    ("root:list:1:id", 2, True),
+    ("root:list:1:address:ipv4", "10.0.0.1", True),
+]
+
+
+class TestPathTable(TestCase):
+
+    def setUp(self):
+        self.table = PathTable(":")
+        for key, value, is_list_type in TEST_ITEMS:
+            self.table.add(key, value, is_list_type)
+
+    def test_views_behave_like_dicts(self):
+        flat_yml = dict((key, value) for key, value, _ in TEST_ITEMS)
+        scalars = dict((key, value) for key, value, is_list_type in TEST_ITEMS if not is_list_type)
+        self.assertEqual(flat_yml, self.table.get_items())
+        self.assertEqual(scalars, self.table.get_scalars())
+        self.assertEqual([key for key, _, _ in TEST_ITEMS], list(self.table.get_items()))
+        self.assertEqual(len(TEST_ITEMS) - 2, len(self.table.get_list_types()))
+        self.assertEqual(2, self.table.get_items()["root:list:1:id"])
+        self.assertIn("root:name", self.table.get_scalars())
+        self.assertNotIn("root:list:0:id", self.table.get_scalars())
+        self.assertNotIn("root:list:1:address", self.table.get_items())
+        self.assertNotIn("root:missing:key", self.table.get_items())
+        self.assertIsNone(self.table.get_items().get(None))
+        self.assertRaises(KeyError, lambda: self.table.get_items()["root"])
+
+    def test_common_prefixes_and_segments_are_stored_once(self):
+        # root, name, list, 0, id, tags, 1, address, ipv4
+        self.assertEqual(9, len(self.table.segments))
+        # The intermediate nodes root, root:list:0, root:list:1 and root:list:1:address have no value
+        self.assertEqual(len(TEST_ITEMS) + 4, len(self.table))
+
+    def test_values_are_replaced_in_place(self):
+        self.table.add("root:name", "other value")
+        self.table.add("root:list:0:id", 3, False)
+        self.assertEqual("other value", self.table.get_items()["root:name"])
+        self.assertEqual([key for key, _, _ in TEST_ITEMS], list(self.table.get_items()))
+        self.assertIn("root:list:0:id", self.table.get_scalars())
+        self.assertEqual(len(TEST_ITEMS) - 3, len(self.table.get_list_types()))
+
+    def test_keys_with_the_separator_in_a_segment_are_split(self):
+        self.table.add("root:list:1:address", {}, True)
+        self.assertIn("root:list:1:address", self.table.get_items())
+        self.assertEqual(["root", "list", "1", "address", "ipv4"],
+                         self.table.get_key(self.table.find("root:list:1:address:ipv4")).split(":"))
+
+    def test_groups_are_the_same_as_the_ones_of_dicts(self):
+        list_types = self.table.get_list_types()
+        groups = ListHandler(self.table.get_items(), ":", list_types).groups
+        expected_groups = ListHandler(dict(self.table.get_items()), ":").groups
+        self.assertEqual(expected_groups, groups)
+        self.assertEqual(list(expected_groups), list(groups))
+        self.assertEqual({"root:list:0:tags:0": "tag"}, groups["root:list:0:tags:0"])
+        self.assertNotIn("root:list", groups)
+        self.assertIsNone(groups.get("root:list:2"))
+
+    def test_table_grows_beyond_its_initial_size(self):
+        table = PathTable(":")
+        for index in range(1000):
+            table.add("root:list:{0}:id".format(index), index, True)
+        self.assertEqual(1000, len(table.get_list_types()))
+        self.assertEqual(999, table.get_items()["root:list:999:id"])
+        self.assertEqual(1003, len(table.segments))
+
+    def test_views_can_be_pickled(self):
+        items = pickle.loads(pickle.dumps(self.table.get_items(), pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(self.table.get_items(), items)
@@ -0,0 +1,34 @@
+import re
+from unittest import TestCase
+
+from yaml_rulz.patterns import PatternCache
+
+
+class TestPatternCache(TestCase):
+
+    def setUp(self):
+        self.cache = PatternCache(max_size=2)
+
+    def test_compiled_patterns_are_reused(self):
+        pattern = self.cache.compile("^foo$")
+        self.assertIs(pattern, self.cache.compile("^foo$"))
+        self.assertEqual({"hits": 1, "misses": 1, "size": 1, "max_size": 2}, self.cache.get_info())
+
+    def test_least_recently_used_pattern_is_evicted(self):
+        foo = self.cache.compile("foo")
+        self.cache.compile("bar")
+        self.cache.compile("foo")
+        self.cache.compile("baz")
+        self.assertIs(foo, self.cache.compile("foo"))
+        self.cache.compile("bar")
+        self.assertEqual({"hits": 2, "misses": 4, "size": 2, "max_size": 2}, self.cache.get_info())
+
+    def test_patterns_too_large_to_compile_raise_regexp_error(self):
+        for pattern in ("a{99999999999}", "(" * 2000 + ")" * 2000):
+            self.assertRaises(re.error, self.cache.compile, pattern)
+        self.assertEqual(0, self.cache.get_info()["size"])
+
+    def test_clear_resets_counters(self):
+        self.cache.compile("foo")
+        self.cache.clear()
+        self.assertEqual({"hits": 0, "misses": 0, "size": 0, "max_size": 2}, self.cache.get_info())
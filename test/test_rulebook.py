@@ -1,3 +1,4 @@
+import json
 from unittest import TestCase
 
 from yaml_rulz.rulebook import OmitRule
@@ -6,6 +7,7 @@ from yaml_rulz.rulebook import GreaterThanRule
 from yaml_rulz.rulebook import LessThanRule
 from yaml_rulz.rulebook import RegExpRule
 from yaml_rulz.rulebook import PredefinedRegExpRule
+from yaml_rulz.rulebook import ReferenceResolver
 from yaml_rulz.rulebook import UniquenessRule
 
 
@@ -111,7 +113,7 @@ UNIQUENESS_RESOURCE_FAIL = {
 }
 
 
-class TestRulebook(TestCase):
+class TestRulebook(TestCase):  # pylint: disable = too-many-public-methods
 
     def test_rule_errors(self):
         rule_errors = [
@@ -126,6 +128,11 @@ class TestRulebook(TestCase):
             result = rule.match(OMIT_RESOURCE)
             self.assertEqual("Error in given criterion", result["message"])
 
+    def test_criterion_with_a_huge_repeat_count_is_not_a_reference(self):
+        rule = GreaterThanRule("schema", "resource", "a{99999999999}")
+        self.assertIsNone(rule.reference_pattern)
+        self.assertEqual("Error in given criterion", rule.match({"resource": 1})["message"])
+
     def test_omit_rule_always_matches(self):
         rule = OmitRule(RULE_KEY, RULE_KEY, OMIT_CRITERION)
         self.assertEqual(None, rule.match(OMIT_RESOURCE))
@@ -180,6 +187,55 @@ class TestRulebook(TestCase):
         self.__assert_rule(UniquenessRule, UNIQUENESS_CRITERION, UNIQUENESS_RESOURCE_FAIL,
                            self.__generate_referred_rule_error_dict)
 
+    def test_rule_can_be_reused_for_multiple_resource_keys(self):
+        rule = GreaterThanRule(RULE_KEY, None, "50")
+        self.assertEqual(None, rule.match({RULE_KEY: 51, REFERRED_KEY: 49}, RULE_KEY))
+        self.assertEqual("50", rule.match({RULE_KEY: 51, REFERRED_KEY: 49}, REFERRED_KEY)["criterion"])
+        self.assertEqual(REFERRED_KEY, rule.match({RULE_KEY: 51, REFERRED_KEY: 49}, REFERRED_KEY)["resource"])
+
+    def test_reference_resolver_is_shared_between_rules(self):
+        resource = {"list:0:tag": 10, "list:1:tag": 20, "list:2:tag": 10}
+        references = ReferenceResolver(resource)
+        rule = UniquenessRule("list:0:tag", None, ".*:tag")
+        self.assertEqual(None, rule.match(resource, "list:1:tag", references))
+        result = rule.match(resource, "list:2:tag", references)
+        self.assertEqual(("list:0:tag", 10, True), (result["schema"], result["criterion"], result["ref"]))
+        self.assertIs(references.resolve(rule.reference_pattern), references.resolve(rule.reference_pattern))
+        self.assertEqual(["list:0:tag", "list:2:tag"],
+                         sorted(references.get_locations_of_value(rule.reference_pattern, "10")))
+
+    def test_uniqueness_lists_the_duplicates_on_the_issue_of_the_first_key(self):
+        resource = {"list:0:tag": 10, "list:1:tag": 20, "list:2:tag": 10, "list:3:tag": "10", "other": 20}
+        references = ReferenceResolver(resource)
+        rule = UniquenessRule("list:0:tag", None, ".*:tag")
+        duplicates = ["list:0:tag", "list:2:tag", "list:3:tag"]
+        results = [rule.match(resource, key, references) for key in duplicates]
+        self.assertEqual([duplicates, None, None], [result.get("duplicates") for result in results])
+        self.assertEqual(["list:2:tag", "list:0:tag", "list:0:tag"], [result["schema"] for result in results])
+        self.assertEqual(None, rule.match(resource, "list:1:tag", references))
+        # A key not matching the pattern names the first referenced key of its value
+        result = rule.match(resource, "other", references)
+        self.assertEqual(("list:1:tag", None), (result["schema"], result.get("duplicates")))
+
+    def test_uniqueness_report_of_a_large_group_grows_linearly(self):
+        resource = dict(("list:{0}:tag".format(index), 1) for index in range(4000))
+        references = ReferenceResolver(resource)
+        rule = UniquenessRule("list:0:tag", None, ".*:tag")
+        results = [rule.match(resource, key, references) for key in resource]
+        self.assertEqual(4000, len([result for result in results if result]))
+        self.assertEqual(4000, len(results[0]["duplicates"]))
+        self.assertEqual(1, len([result for result in results if "duplicates" in result]))
+        self.assertLess(len(json.dumps(results)), 4000 * 250)
+
+    def test_uniqueness_scales_linearly_with_the_number_of_items(self):
+        resource = dict(("list:{0}:tag".format(index), index // 2) for index in range(20000))
+        references = ReferenceResolver(resource)
+        rule = UniquenessRule("list:0:tag", None, ".*:tag")
+        results = [rule.match(resource, key, references) for key in resource]
+        self.assertEqual(20000, len([result for result in results if result]))
+        self.assertEqual(2, len(results[-2]["duplicates"]))
+        self.assertNotIn("duplicates", results[-1])
+
     def __assert_rule(self, rule_class, criteria, resource, error_generator_callback):
         for criterion in criteria:
             rule = rule_class(RULE_KEY, RULE_KEY, criterion)
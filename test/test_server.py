@@ -0,0 +1,143 @@
+import json
+import os
+import socket
+import threading
+
+try:
+    from mock import patch
+except ImportError:
+    from unittest.mock import patch
+
+from yaml_rulz.client import get_default_socket
+from yaml_rulz.client import send_request
+from yaml_rulz.server import SchemaPool
+from yaml_rulz.server import ValidationServer
+
+from .helpers import TemporaryDirectoryTestCase
+
+
+SCHEMA_CONTENT = r"""
+---
+root:
+  key_a: "~ exactly this"
+  key_b: "@ num | > 15"
+"""
+RESOURCES = {
+    "ok.yml": "root:\n  key_a: exactly this\n  key_b: 16\n",
+    "failing.yml": "root:\n  key_a: exactly this\n  key_b: 6\n",
+}
+
+
+class TestServer(TemporaryDirectoryTestCase):
+
+    def setUp(self):
+        super(TestServer, self).setUp()
+        self.schema_file = self.__write_file("schema.yml", SCHEMA_CONTENT)
+        self.resource_files = [self.__write_file(filename, RESOURCES[filename]) for filename in sorted(RESOURCES)]
+        self.socket_path = os.path.join(self.directory, "yaml_rulz.sock")
+
+    def test_schema_pool_reuses_and_reloads_schemas(self):
+        pool = SchemaPool(max_size=1)
+        schema = pool.get(self.schema_file)
+        self.assertIs(schema, pool.get(self.schema_file))
+        self.__write_file("schema.yml", SCHEMA_CONTENT + "  key_c: \"* any\"\n")
+        self.assertIsNot(schema, pool.get(self.schema_file))
+        pool.get(self.schema_file, "safe")
+        self.assertEqual(1, len(pool))
+
+    def test_server_validates_requested_resources(self):
+        server = ValidationServer(self.socket_path)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            response = send_request({"schema": self.schema_file, "resources": self.resource_files},
+                                    self.socket_path)
+            error_response = send_request({"schema": os.path.join(self.directory, "missing.yml"),
+                                           "resources": self.resource_files}, self.socket_path)
+            missing_response = send_request({"schema": self.schema_file,
+                                             "resources": [os.path.join(self.directory, "missing.yml")]},
+                                            self.socket_path)
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.assertEqual([(self.resource_files[0], True, 1), (self.resource_files[1], False, 0)],
+                         [(result["file"], result["has_errors"], len(result["issues"]))
+                          for result in response["results"]])
+        self.assertNotIn("error", response["results"][0])
+        self.assertIn("error", error_response)
+        missing_result = missing_response["results"][0]
+        self.assertIn("missing.yml", missing_result["error"])
+        self.assertEqual((True, [missing_result["error"]]),
+                         (missing_result["has_errors"], [issue["message"] for issue in missing_result["issues"]]))
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_stale_socket_is_replaced(self):
+        stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale_socket.bind(self.socket_path)
+        stale_socket.close()
+        ValidationServer(self.socket_path).server_close()
+
+    def test_request_fails_without_server(self):
+        self.assertRaises(socket.error, send_request, {}, self.socket_path)
+
+    def test_request_times_out_without_answer(self):
+        hung_server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            hung_server.bind(self.socket_path)
+            hung_server.listen(1)
+            self.assertRaises(socket.timeout, send_request, {}, self.socket_path, 0.05)
+        finally:
+            hung_server.close()
+
+    def test_requests_with_invalid_fields_are_rejected(self):
+        server = ValidationServer(self.socket_path)
+        try:
+            for request in ({"schema": 0, "resources": []}, {"schema": self.schema_file, "resources": [1]},
+                            {"schema": self.schema_file, "resources": "a.yml"}, [self.schema_file],
+                            {"schema": self.schema_file, "resources": [], "exclusions": 2},
+                            {"schema": self.schema_file, "resources": [], "max_errors": "1"},
+                            {"schema": self.schema_file, "resources": [], "max_errors": -1},
+                            {"schema": self.schema_file, "resources": [], "stream": 1}):
+                response = server.process_validation_request(json.dumps(request).encode("utf-8"))
+                self.assertTrue(response["error"].startswith("Invalid request"), response)
+        finally:
+            server.server_close()
+
+    def test_socket_and_its_directory_are_private(self):
+        socket_path = os.path.join(self.directory, "private", "yaml_rulz.sock")
+        server = ValidationServer(socket_path)
+        try:
+            self.assertEqual(0o700, os.stat(os.path.dirname(socket_path)).st_mode & 0o777)
+            self.assertEqual(0o600, os.stat(socket_path).st_mode & 0o777)
+        finally:
+            server.server_close()
+
+    def test_default_socket_directory_must_be_private(self):
+        socket_path = os.path.join(self.directory, "yaml_rulz.sock")
+        os.chmod(self.directory, 0o777)
+        with patch("yaml_rulz.server.DEFAULT_SOCKET", socket_path):
+            self.assertRaises(socket.error, ValidationServer, socket_path)
+
+    def test_default_socket_is_in_the_runtime_directory(self):
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": self.directory}):
+            self.assertEqual(os.path.join(self.directory, "yaml_rulz.sock"), get_default_socket())
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": ""}):
+            default_directory = os.path.dirname(get_default_socket())
+            self.assertEqual("yaml_rulz-{0}".format(os.getuid()), os.path.basename(default_directory))
+
+    def test_requests_are_not_sent_to_sockets_of_other_users(self):
+        server = ValidationServer(self.socket_path)
+        try:
+            with patch("yaml_rulz.client.os.getuid", return_value=os.getuid() + 1):
+                self.assertRaises(socket.error, send_request, {}, self.socket_path)
+        finally:
+            server.server_close()
+
+    def __write_file(self, filename, content):
+        path = os.path.join(self.directory, filename)
+        with open(path, "w") as handler:
+            handler.write(content)
+        # Modification time may not change between quick writes
+        os.utime(path, (os.path.getmtime(path) + 1, os.path.getmtime(path) + 1))
+        return path
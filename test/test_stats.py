@@ -0,0 +1,90 @@
+import os
+
+from yaml_rulz.stats import time_phase
+from yaml_rulz.stats import ValidationStats
+from yaml_rulz.streaming import StreamingValidator
+from yaml_rulz.validator import YAMLValidator
+
+from .helpers import TemporaryDirectoryTestCase
+
+
+SCHEMA_CONTENT = r"""
+---
+root:
+  key_a: "~ exactly this"
+  key_b: "@ num | > root:limit"
+  key_c: "? true"
+  limit: "@ num"
+  list:
+    - name: "~ item"
+      id: "! root:list:\\d+:id"
+"""
+RESOURCE_CONTENT = r"""
+---
+root:
+  key_a: exactly this
+  key_b: 6
+  key_c: true
+  limit: 10
+  list:
+    - name: item_a
+      id: 1
+    - name: item_b
+      id: 1
+"""
+
+
+class TestValidationStats(TemporaryDirectoryTestCase):
+
+    def test_phases_and_counters_are_collected(self):
+        stats = ValidationStats()
+        YAMLValidator(SCHEMA_CONTENT, RESOURCE_CONTENT, stats=stats).get_validation_issues()
+        info = stats.get_info()
+        for phase in ("schema parse", "schema flatten", "schema grouping", "schema compile", "resource parse",
+                      "resource flatten", "resource grouping", "missing keys", "scalar rules", "list rules",
+                      "reference scans"):
+            self.assertGreaterEqual(info["phases"][phase], 0.0)
+        self.assertEqual({"~": 3, "@": 2, ">": 1, "?": 1, "*": 1, "!": 2}, info["rule_evaluations"])
+        # The criteria of the >, ? and ! rules are looked up as references in the 9 flat keys of the resource
+        self.assertEqual(3, info["reference_scans"])
+        self.assertEqual(27, info["scanned_keys"])
+        self.assertEqual(3 + 2, info["regexp_rule_evaluations"])
+        self.assertEqual({1: 2}, info["prototype_candidates"])
+        self.assertEqual([], info["slowest_rules"])
+
+    def test_slowest_rules_are_reported_in_profile_mode(self):
+        stats = ValidationStats(profile=True, top=2)
+        YAMLValidator(SCHEMA_CONTENT, RESOURCE_CONTENT, stats=stats).get_validation_issues()
+        slowest = stats.get_info()["slowest_rules"]
+        self.assertEqual(2, len(slowest))
+        self.assertGreaterEqual(slowest[0]["time"], slowest[1]["time"])
+        self.assertEqual(set(["schema", "rule", "count", "time"]), set(slowest[0]))
+
+    def test_stats_are_merged(self):
+        stats, other = ValidationStats(profile=True), ValidationStats(profile=True)
+        YAMLValidator(SCHEMA_CONTENT, RESOURCE_CONTENT, stats=stats).get_validation_issues()
+        YAMLValidator(SCHEMA_CONTENT, RESOURCE_CONTENT, stats=other).get_validation_issues()
+        stats.merge(other)
+        self.assertEqual(2 * other.rule_evaluations["~"], stats.rule_evaluations["~"])
+        self.assertEqual(6, stats.reference_scans)
+        self.assertEqual(set(other.rule_times), set(stats.rule_times))
+        self.assertEqual(2 * sum(count for count, _ in other.rule_times.values()),
+                         sum(count for count, _ in stats.rule_times.values()))
+
+    def test_streaming_validator_collects_stats(self):
+        resource_file = os.path.join(self.directory, "resource.yml")
+        with open(resource_file, "w") as handler:
+            handler.write(RESOURCE_CONTENT)
+        stats = ValidationStats()
+        StreamingValidator(SCHEMA_CONTENT, resource_file, stats=stats).get_validation_issues()
+        self.assertIn("reference pass", stats.phases)
+        self.assertIn("stream validation", stats.phases)
+        self.assertEqual(10, sum(stats.rule_evaluations.values()))
+
+    def test_time_phase_without_stats_is_a_no_op(self):
+        with time_phase(None, "phase") as timer:
+            self.assertIsNotNone(timer)
+        stats = ValidationStats()
+        with time_phase(stats, "phase"):
+            pass
+        self.assertEqual(["phase"], list(stats.phases))
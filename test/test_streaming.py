@@ -0,0 +1,126 @@
+import json
+import os
+import random
+
+import yaml
+
+from yaml_rulz.errors import YAMLHandlerError
+from yaml_rulz.streaming import FlatEventStream
+from yaml_rulz.streaming import NODE_END
+from yaml_rulz.streaming import StreamingValidator
+from yaml_rulz.validator import YAMLValidator
+from yaml_rulz.yaml_handler import ResourceHandler
+
+from .helpers import TemporaryDirectoryTestCase
+
+
+SCHEMA_CONTENT = r"""
+---
+root:
+  name: "~ ^host\\d+$"
+  mtu: "> 1000 | < 9001"
+  min_mtu: "< root:mtu"
+  missing: "* whatever"
+  interfaces:
+    - name: "~ eth\\d+"
+      vlan_tag: "> 0 | < 4096 | ! .*:vlan_tag"
+    - name: "~ bond\\d+"
+      slaves:
+        - "~ eth\\d+"
+  tags:
+    - "~ [a-z]+"
+"""
+RESOURCE_CONTENT = """
+---
+root:
+  name: host1
+  mtu: 9500
+  min_mtu: 9600
+  extra: 1
+  interfaces:
+    - name: eth0
+      vlan_tag: 10
+    - name: wl1
+      vlan_tag: 10
+    - name: bond2
+      slaves:
+        - eth0
+        - xx1
+    - &interface
+      name: eth3
+      vlan_tag: 5000
+    - *interface
+  tags:
+    - abc
+    - X1
+"""
+EXCLUSIONS = """
+root:interfaces:1
+"""
+# Numeric keys and keys sharing their prefix, which are grouped together by the list handler
+RANDOM_KEYS = ["0", "1", "12", "1st", "1x", "2a", "a", "b:c"]
+RANDOM_SCHEMAS = ["r: {}\n", "r:\n  - a: '> 0'\n  - '~ v'\n", "r:\n  '1':\n    - '> 2'\n  1st: '* x'\n"]
+
+
+class TestStreaming(TemporaryDirectoryTestCase):
+
+    def test_streamed_items_match_flattened_resource(self):
+        for content in (RESOURCE_CONTENT, "- 1\n- key: 2\n", "5\n", ""):
+            handler = ResourceHandler(content)
+            with open(self.__write_resource(content), "r") as stream:
+                items = [item for item in FlatEventStream(stream) if item[1] is not NODE_END]
+            self.assertEqual(handler.flat_yml, dict((key, value) for key, value, _ in items))
+            self.assertEqual(handler.list_handler.list_types,
+                             dict((key, value) for key, value, is_list_type in items if is_list_type))
+
+    def test_streaming_validator_matches_validator(self):
+        resource_file = self.__write_resource(RESOURCE_CONTENT)
+        for skip_excluded in (False, True):
+            expected = YAMLValidator(SCHEMA_CONTENT, RESOURCE_CONTENT, EXCLUSIONS, skip_excluded=skip_excluded)
+            actual = StreamingValidator(SCHEMA_CONTENT, resource_file, EXCLUSIONS, skip_excluded=skip_excluded)
+            expected_has_errors, expected_issues = expected.get_validation_issues()
+            actual_has_errors, actual_issues = actual.get_validation_issues()
+            self.assertTrue(actual_has_errors)
+            self.assertEqual(expected_has_errors, actual_has_errors)
+            self.assertEqual(self.__normalize(expected_issues), self.__normalize(actual_issues))
+
+    def test_streaming_validator_matches_validator_on_random_resources(self):
+        # "1st" comes after the node of "1" is finished, but it is in the same group
+        resources = [{"r": {"12": {"b:c": {"1": {"0": 5, "a": 1}, "1st": 1}}}}]
+        resources += [{"r": self.__generate_node(random.Random(seed), 0)} for seed in range(300)]
+        for index, resource in enumerate(resources):
+            content = yaml.safe_dump(resource)
+            schema = RANDOM_SCHEMAS[index % len(RANDOM_SCHEMAS)]
+            _, expected_issues = YAMLValidator(schema, content).get_validation_issues()
+            _, actual_issues = StreamingValidator(schema, self.__write_resource(content)).get_validation_issues()
+            self.assertEqual(self.__normalize(expected_issues), self.__normalize(actual_issues), content)
+
+    def test_streaming_validation_stops_after_max_errors(self):
+        validator = StreamingValidator(SCHEMA_CONTENT, self.__write_resource(RESOURCE_CONTENT))
+        _, issues = validator.get_validation_issues(max_errors=2)
+        self.assertEqual(2, len(issues))
+
+    def test_unsupported_and_invalid_resources_raise_errors(self):
+        for content in ("a: 1\n---\nb: 2\n", "a: *anchor\n", "a: &anchor {b: 1}\nc:\n  <<: *anchor\n",
+                        "a: !!set {b}\n", "a: [\n"):
+            validator = StreamingValidator(SCHEMA_CONTENT, self.__write_resource(content))
+            self.assertRaises(YAMLHandlerError, validator.get_validation_issues)
+
+    def __write_resource(self, content):
+        path = os.path.join(self.directory, "resource.yml")
+        with open(path, "w") as handler:
+            handler.write(content)
+        return path
+
+    def __generate_node(self, generator, depth):
+        choice = generator.random()
+        if depth > 3 or choice < 0.3:
+            return generator.choice([1, 5, "v"])
+        if choice < 0.5:
+            return [self.__generate_node(generator, depth + 1) for _ in range(generator.randint(0, 3))]
+        return dict((generator.choice(RANDOM_KEYS), self.__generate_node(generator, depth + 1))
+                    for _ in range(generator.randint(1, 4)))
+
+    @staticmethod
+    def __normalize(issues):
+        return sorted(json.dumps(issue, sort_keys=True) for issue in issues)
@@ -1,5 +1,8 @@
+import json
 from unittest import TestCase
 
+from yaml_rulz.stats import ValidationStats
+from yaml_rulz.validator import compile_schema
 from yaml_rulz.validator import YAMLValidator
 
 
@@ -53,6 +56,27 @@ ISSUES = [
      "schema": "root:key_b",
      "value": 6},
 ]
+PROTOTYPE_SCHEMA_CONTENT = r"""
+---
+hosts:
+  - name: "~ [a-z]+"
+    port: "@ num | > 1023"
+  - name: "~ [a-z]+"
+    address: "@ ipv4"
+"""
+PROTOTYPE_RESOURCE_CONTENT = r"""
+---
+hosts:
+  - name: a
+    port: 8080
+  - name: b
+    address: 10.0.0.1
+  - name: c
+    port: 80
+  - name: d
+    port: 8080
+    address: 10.0.0.2
+"""
 
 
 class TestValidator(TestCase):
@@ -74,6 +98,72 @@ class TestValidator(TestCase):
             for issue in ISSUES:
                 self.assertIn(issue, issues)
 
+    def test_issues_are_streamed_with_severity(self):
+        validator = YAMLValidator(SCHEMA_CONTENT, RESOURCE_WITH_ISSUES, EXCLUSIONS)
+        issues = list(validator.iter_validation_issues())
+        self.assertEqual(len(ISSUES), len(issues))
+        for issue in ISSUES:
+            self.assertIn(issue, issues)
+
+    def test_validation_stops_after_max_errors(self):
+        validator = YAMLValidator(SCHEMA_CONTENT, RESOURCE_WITH_ISSUES, EXCLUSIONS)
+        has_errors, issues = validator.get_validation_issues(max_errors=1)
+        self.assertTrue(has_errors)
+        self.assertEqual(1, len([issue for issue in issues if issue["severity"] == "Error"]))
+        self.assertEqual("Error", issues[-1]["severity"])
+
+    def test_excluded_keys_can_be_skipped(self):
+        validator = YAMLValidator(SCHEMA_CONTENT, RESOURCE_WITH_ISSUES, EXCLUSIONS, skip_excluded=True)
+        has_errors, issues = validator.get_validation_issues()
+        self.assertTrue(has_errors)
+        self.assertEqual([issue for issue in ISSUES if issue["severity"] == "Error"],
+                         sorted(issues, key=lambda issue: issue["resource"], reverse=True))
+
+    def test_criterion_with_a_huge_repeat_count_is_reported_as_an_issue(self):
+        has_errors, issues = YAMLValidator('a: "> a{99999999999}"\n', "a: 1\n").get_validation_issues()
+        self.assertTrue(has_errors)
+        self.assertEqual([("a", "Error in given criterion")], [(issue["schema"], issue["message"]) for issue in issues])
+
+    def test_compiled_schema_validates_many_resources(self):
+        schema = compile_schema(SCHEMA_CONTENT)
+        self.assertEqual((False, []), schema.validate(RESOURCE_ALL_OK))
+        has_errors, issues = schema.validate(RESOURCE_WITH_ISSUES, EXCLUSIONS)
+        self.assertTrue(has_errors)
+        self.assertEqual(len(ISSUES), len(issues))
+        for issue in ISSUES:
+            self.assertIn(issue, issues)
+        self.assertEqual((False, []), YAMLValidator(schema, RESOURCE_ALL_OK).get_validation_issues())
+
+    def test_prototypes_are_indexed_by_path_and_shape(self):
+        schema = compile_schema(PROTOTYPE_SCHEMA_CONTENT)
+        path_mask = schema.schema_handler.list_handler.get_key_mask("hosts:0")
+        self.assertEqual(["hosts:0", "hosts:1"], sorted(schema.prototype_paths[path_mask]))
+        stats = ValidationStats()
+        validator = YAMLValidator(schema, PROTOTYPE_RESOURCE_CONTENT, stats=stats)
+        has_errors, issues = validator.get_validation_issues()
+        self.assertTrue(has_errors)
+        self.assertEqual(["hosts:2:port", "hosts:3"], sorted(issue["resource"] for issue in issues))
+        self.assertEqual("No matching prototype was found", [issue for issue in issues
+                                                             if issue["resource"] == "hosts:3"][0]["message"])
+        # Every group is validated against the single prototype of its shape, except the one without a prototype
+        self.assertEqual({1: 3, 0: 1}, dict(stats.prototype_candidates))
+
+    def test_compact_resource_gives_the_same_issues(self):
+        for resource, exclusions in ((RESOURCE_WITH_ISSUES, EXCLUSIONS), (PROTOTYPE_RESOURCE_CONTENT, None)):
+            schema = SCHEMA_CONTENT if exclusions else PROTOTYPE_SCHEMA_CONTENT
+            self.assertEqual(YAMLValidator(schema, resource, exclusions).get_validation_issues(),
+                             YAMLValidator(schema, resource, exclusions, compact=True).get_validation_issues())
+
+    def test_report_of_a_large_duplicate_group_grows_linearly(self):
+        schema = "---\nitems:\n  - tag: '! .*:tag'\n"
+        sizes = []
+        for count in (1000, 4000):
+            resource = "---\nitems:\n" + "  - tag: 1\n" * count
+            _, issues = YAMLValidator(schema, resource).get_validation_issues()
+            self.assertEqual(count, len(issues))
+            sizes.append(len(json.dumps(issues)))
+        self.assertLess(sizes[1], sizes[0] * 5)
+
     @staticmethod
     def __create_validator_and_get_result(resource, exclusions=None):
         validator = YAMLValidator(SCHEMA_CONTENT, resource, exclusions)
@@ -0,0 +1,74 @@
+import os
+
+from yaml_rulz.watch import FileWatcher
+from yaml_rulz.watch import ValidationWatcher
+
+from .helpers import TemporaryDirectoryTestCase
+
+
+SCHEMA_CONTENT = r"""
+---
+root:
+  key_a: "~ exactly this"
+  key_b: "@ num | > 15"
+"""
+RESOURCE_CONTENT = "root:\n  key_a: exactly this\n  key_b: 16\n"
+
+
+class TestWatch(TemporaryDirectoryTestCase):
+
+    def setUp(self):
+        super(TestWatch, self).setUp()
+        self.schema_file = self.__write_file("schema.yml", SCHEMA_CONTENT)
+        self.resource_file = self.__write_file("resource.yml", RESOURCE_CONTENT)
+
+    def test_file_watcher_reports_changed_files(self):
+        watcher = FileWatcher([self.schema_file, self.resource_file])
+        self.assertEqual([], watcher.poll())
+        self.__write_file("resource.yml", RESOURCE_CONTENT + "  key_c: 1\n")
+        self.assertEqual([self.resource_file], watcher.poll())
+        os.remove(self.resource_file)
+        self.assertEqual([self.resource_file], watcher.poll())
+        self.assertEqual([], watcher.poll())
+
+    def test_watcher_reports_new_and_resolved_issues(self):
+        watcher = ValidationWatcher(self.schema_file, [self.resource_file])
+        self.assertEqual([(self.schema_file, [], []), (self.resource_file, [], [])], watcher.validate())
+        self.__write_file("resource.yml", RESOURCE_CONTENT.replace("16", "6"))
+        (filename, new_issues, resolved_issues), = watcher.check()
+        self.assertEqual(self.resource_file, filename)
+        self.assertEqual(["Value must be greater than criterion"], [issue["message"] for issue in new_issues])
+        self.assertEqual([], resolved_issues)
+        self.assertEqual([], watcher.check())
+        self.__write_file("schema.yml", SCHEMA_CONTENT.replace("> 15", "> 5"))
+        (filename, new_issues, resolved_issues), = watcher.check()
+        self.assertEqual(([], ["Value must be greater than criterion"]),
+                         (new_issues, [issue["message"] for issue in resolved_issues]))
+
+    def test_watcher_stops_after_max_errors(self):
+        watcher = ValidationWatcher(self.schema_file, [self.resource_file], max_errors=1)
+        watcher.validate()
+        self.__write_file("resource.yml", "root:\n  key_a: other\n  key_b: 6\n")
+        (_, new_issues, _), = watcher.check()
+        self.assertEqual(1, len(new_issues))
+
+    def test_watcher_reports_broken_files_as_issues(self):
+        watcher = ValidationWatcher(self.schema_file, [self.resource_file])
+        watcher.validate()
+        self.__write_file("schema.yml", "root:\n  key: value\n   other_key: other_value\n")
+        (filename, new_issues, _), = watcher.check()
+        self.assertEqual(self.schema_file, filename)
+        self.assertTrue(new_issues[0]["message"].startswith("Error in schema"))
+
+    def test_run_calls_back_with_changes(self):
+        changes = []
+        ValidationWatcher(self.schema_file, [self.resource_file]).run(changes.append, interval=0, max_checks=1)
+        self.assertEqual([[]], changes)
+
+    def __write_file(self, filename, content):
+        path = os.path.join(self.directory, filename)
+        with open(path, "w") as handler:
+            handler.write(content)
+        # Modification time may not change between quick writes
+        os.utime(path, (os.path.getmtime(path) + 1, os.path.getmtime(path) + 1))
+        return path
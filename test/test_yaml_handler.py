@@ -1,3 +1,4 @@
+import sys
 from unittest import TestCase
 
 try:
@@ -5,6 +6,9 @@ try:
 except ImportError:
     from unittest.mock import patch
 
+from yaml_rulz.list_handler import ListHandler
+from yaml_rulz.yaml_handler import DEFAULT_LOADER
+from yaml_rulz.yaml_handler import LOADERS
 from yaml_rulz.yaml_handler import YAMLHandlerBase
 from yaml_rulz.yaml_handler import YAMLHandlerError
 
@@ -75,3 +79,34 @@ class TestYAMLHandler(TestCase):
         handler = YAMLHandlerBase(VALID_YAML)
         self.assertEqual(VALID_YAML_SCALARS, handler.scalars)
         self.assertEqual(all_data, handler.flat_yml)
+
+    def test_handler_uses_safe_loader_by_default(self):
+        self.assertIs(DEFAULT_LOADER, YAMLHandlerBase(VALID_YAML).loader)
+        self.assertRaises(YAMLHandlerError, YAMLHandlerBase, "!!python/object/apply:os.getcwd []")
+
+    def test_all_loaders_produce_the_same_flat_yml(self):
+        flat_ymls = [YAMLHandlerBase(VALID_YAML, loader=loader).flat_yml for loader in LOADERS.values()]
+        for flat_yml in flat_ymls:
+            self.assertEqual(flat_ymls[0], flat_yml)
+
+    def test_list_types_are_collected_while_flattening(self):
+        handler = YAMLHandlerBase(VALID_YAML)
+        self.assertEqual(VALID_YAML_LIST_TYPES, handler.list_handler.list_types)
+        self.assertEqual(ListHandler(handler.flat_yml, ":").list_types, handler.list_handler.list_types)
+
+    def test_compact_handler_has_the_same_flat_yml_and_groups(self):
+        handler = YAMLHandlerBase(VALID_YAML)
+        compact_handler = YAMLHandlerBase(VALID_YAML, compact=True)
+        self.assertEqual(list(handler.flat_yml.items()), list(compact_handler.flat_yml.items()))
+        self.assertEqual(handler.scalars, compact_handler.scalars)
+        self.assertEqual(handler.list_handler.list_types, compact_handler.list_handler.list_types)
+        self.assertEqual(handler.list_handler.groups, compact_handler.list_handler.groups)
+
+    def test_deeply_nested_yaml_is_flattened(self):
+        depth = sys.getrecursionlimit() * 2
+        nested_yml = "value"
+        for _ in range(depth):
+            nested_yml = {"a": [nested_yml]}
+        flat_yml, scalars, _ = YAMLHandlerBase("")._get_flat_dicts(nested_yml)  # pylint: disable = protected-access
+        self.assertEqual("value", flat_yml[":".join(["a", "0"] * depth)])
+        self.assertEqual({"a": []}, scalars)
@@ -0,0 +1,38 @@
+__version__ = "0.0.1"
+
+import sys
+
+
+__all__ = ["compile_schema", "CompiledSchema", "IncrementalValidator", "StreamingValidator", "ValidationStats",
+           "YAMLValidator"]
+
+_EXPORTED_FROM = {
+    "compile_schema": "yaml_rulz.validator",
+    "CompiledSchema": "yaml_rulz.validator",
+    "IncrementalValidator": "yaml_rulz.incremental",
+    "StreamingValidator": "yaml_rulz.streaming",
+    "ValidationStats": "yaml_rulz.stats",
+    "YAMLValidator": "yaml_rulz.validator",
+}
+
+if sys.version_info >= (3, 7):
+    from importlib import import_module
+
+    # Exported names are imported on first use, so e.g. the command line tool does not load the validator and PyYAML
+    # for a cached result
+    def __getattr__(name):
+        if name not in _EXPORTED_FROM:
+            raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+        value = getattr(import_module(_EXPORTED_FROM[name]), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(__all__))
+else:
+    from yaml_rulz.incremental import IncrementalValidator
+    from yaml_rulz.stats import ValidationStats
+    from yaml_rulz.streaming import StreamingValidator
+    from yaml_rulz.validator import compile_schema
+    from yaml_rulz.validator import CompiledSchema
+    from yaml_rulz.validator import YAMLValidator
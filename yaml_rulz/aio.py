@@ -0,0 +1,102 @@
+# Python 3.5+ only, this module is not imported by the package itself
+
+import asyncio
+from functools import partial
+
+from yaml_rulz.errors import YAMLHandlerError
+from yaml_rulz.rulebook import ERROR_SEVERITY
+from yaml_rulz.rulebook import get_rule_response_dict
+from yaml_rulz.validator import CompiledSchema
+from yaml_rulz.validator import WARNING_SEVERITY
+from yaml_rulz.validator import YAMLValidator
+
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CONCURRENCY = 4
+
+
+class ChunkedValidator(YAMLValidator):
+
+    # Validation is split into chunks of scalars and list groups, which are run one by one in an executor, so the
+    # event loop is never blocked for long and validation can be cancelled between two chunks.
+
+    def iter_issue_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        yield self._find_missing_resource_scalars
+        yield self._find_missing_schema_scalars
+        scalars = list(self.resource_handler.scalars.items())
+        for start in range(0, len(scalars), chunk_size):
+            yield partial(self._validate_rules, self.schema.scalar_index, dict(scalars[start:start + chunk_size]))
+        groups = list(self.resource_handler.list_handler.groups.items())
+        for start in range(0, len(groups), chunk_size):
+            yield partial(self._validate_list_groups, groups[start:start + chunk_size])
+
+    def run_chunk(self, chunk):
+        issues = []
+        for issue in chunk():
+            self._update_severity(issue)
+            if not (self.skip_excluded and issue["severity"] == WARNING_SEVERITY):
+                issues.append(issue)
+        return issues
+
+    def _validate_list_groups(self, groups):
+        for resource_path, resource in groups:
+            for result in self._validate_list_group(resource_path, resource):
+                yield result
+
+
+async def compile_schema_async(schema_content, loader=None, executor=None):
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, partial(CompiledSchema, schema_content, loader=loader))
+
+
+async def validate_async(schema_content, resource_content,  # pylint: disable = too-many-arguments
+                         exclusions_content=None, loader=None, skip_excluded=False, max_errors=None,
+                         executor=None, chunk_size=DEFAULT_CHUNK_SIZE, timeout=None):
+    # Returns the same (has_errors, issues) tuple as YAMLValidator.get_validation_issues(). The executor should be a
+    # thread pool (the default executor of the loop is used if it is None), since chunks share the parsed resource.
+    coroutine = _validate(schema_content, resource_content, exclusions_content, loader, skip_excluded, max_errors,
+                          executor, chunk_size)
+    if timeout is None:
+        return await coroutine
+    return await asyncio.wait_for(coroutine, timeout)
+
+
+async def validate_many_async(schema_content, resources,  # pylint: disable = too-many-arguments
+                              exclusions_content=None, loader=None, skip_excluded=False, max_errors=None,
+                              executor=None, chunk_size=DEFAULT_CHUNK_SIZE, timeout=None,
+                              concurrency=DEFAULT_CONCURRENCY):
+    # Results are in the order of resources. Invalid resources and timeouts are reported as issues.
+    if not isinstance(schema_content, CompiledSchema):
+        schema_content = await compile_schema_async(schema_content, loader, executor)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def validate_resource(resource_content):
+        async with semaphore:
+            try:
+                return await validate_async(schema_content, resource_content, exclusions_content, loader,
+                                            skip_excluded, max_errors, executor, chunk_size, timeout)
+            except YAMLHandlerError as exc:
+                return True, [get_rule_response_dict(message=str(exc))]
+            except asyncio.TimeoutError:
+                return True, [get_rule_response_dict(message="Validation timed out after {0}s".format(timeout))]
+
+    return await asyncio.gather(*[validate_resource(resource_content) for resource_content in resources])
+
+
+async def _validate(schema_content, resource_content,  # pylint: disable = too-many-arguments
+                    exclusions_content, loader, skip_excluded, max_errors, executor, chunk_size):
+    loop = asyncio.get_event_loop()
+    if not isinstance(schema_content, CompiledSchema):
+        schema_content = await compile_schema_async(schema_content, loader, executor)
+    validator = await loop.run_in_executor(executor, partial(ChunkedValidator, schema_content, resource_content,
+                                                             exclusions_content, loader, skip_excluded))
+    issues = []
+    error_count = 0
+    for chunk in validator.iter_issue_chunks(chunk_size):
+        for issue in await loop.run_in_executor(executor, validator.run_chunk, chunk):
+            issues.append(issue)
+            if issue["severity"] == ERROR_SEVERITY:
+                error_count += 1
+                if max_errors and error_count >= max_errors:
+                    return True, issues
+    return error_count > 0, issues
@@ -0,0 +1,120 @@
+from multiprocessing import cpu_count
+from multiprocessing import Pool
+
+from yaml_rulz.cache import get_namespace
+from yaml_rulz.cache import ResultCache
+from yaml_rulz.documents import get_document_validation_issues
+from yaml_rulz.errors import YAMLHandlerError
+from yaml_rulz.rulebook import get_rule_response_dict
+from yaml_rulz.streaming import StreamingValidator
+from yaml_rulz.validator import CompiledSchema
+from yaml_rulz.validator import YAMLValidator
+
+
+CHUNKS_PER_WORKER = 4
+
+# Copied to every worker process by the pool initializer, the schema is compiled on the first cache miss
+_WORKER_STATE = {}
+
+
+def validate_files(schema_content, resource_files, exclusions_content=None,  # pylint: disable = too-many-arguments
+                   jobs=1, loader=None, max_errors=None, skip_excluded=False, stream=False, cache_dir=None,
+                   documents=False):
+    # Results are (resource_file, has_errors, issues) tuples in the order of resource_files
+    options = {
+        "exclusions_content": exclusions_content,
+        "max_errors": max_errors,
+        "skip_excluded": skip_excluded,
+        "stream": stream,
+        "documents": documents,
+    }
+    state = {
+        "schema_content": schema_content,
+        "loader": loader,
+        "options": options,
+        "cache": ResultCache(cache_dir) if cache_dir else None,
+        "cache_namespace": get_namespace(schema_content, exclusions_content, max_errors, skip_excluded, stream,
+                                         documents),
+    }
+    jobs = jobs or cpu_count()
+    if jobs == 1 or len(resource_files) < 2:
+        return [_validate_file(state, resource_file) for resource_file in resource_files]
+    pool = Pool(jobs, initializer=_init_worker, initargs=(state,))
+    try:
+        chunksize = max(1, len(resource_files) // (jobs * CHUNKS_PER_WORKER))
+        return pool.map(_validate_file_in_worker, resource_files, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def validate_file(schema, resource_file, exclusions_content=None,  # pylint: disable = too-many-arguments
+                  max_errors=None, skip_excluded=False, stream=False, documents=False):
+    # Same as validate_files() for a single resource, with a CompiledSchema. Errors of reading or parsing the resource
+    # are raised, so the caller can report them as without the batch.
+    options = {
+        "exclusions_content": exclusions_content,
+        "max_errors": max_errors,
+        "skip_excluded": skip_excluded,
+        "stream": stream,
+        "documents": documents,
+    }
+    return (resource_file,) + _validate_resource(schema, options, resource_file)
+
+
+def _init_worker(state):
+    _WORKER_STATE.update(state)
+
+
+def _validate_file_in_worker(resource_file):
+    return _validate_file(_WORKER_STATE, resource_file)
+
+
+def _validate_file(state, resource_file):
+    try:
+        key, result = _get_cached_result(state, resource_file)
+    except (IOError, OSError) as exc:
+        return resource_file, True, [get_rule_response_dict(message=str(exc))]
+    if result is not None:
+        return (resource_file,) + tuple(result)
+    # Schema errors are not specific to a resource, so they are raised
+    schema = _get_schema(state)
+    try:
+        result = _validate_resource(schema, state["options"], resource_file)
+    except (IOError, OSError, YAMLHandlerError) as exc:
+        return resource_file, True, [get_rule_response_dict(message=str(exc))]
+    if key is not None:
+        state["cache"].set(key, result)
+    return (resource_file,) + result
+
+
+def _get_cached_result(state, resource_file):
+    cache = state["cache"]
+    if cache is None:
+        return None, None
+    key = cache.get_resource_key(state["cache_namespace"], resource_file)
+    return key, cache.get(key)
+
+
+def _get_schema(state):
+    if "schema" not in state:
+        state["schema"] = CompiledSchema(state["schema_content"], loader=state["loader"])
+    return state["schema"]
+
+
+def _validate_resource(schema, options, resource_file):
+    if options["documents"]:
+        # Documents are parsed one by one, so --stream is not needed
+        with open(resource_file, "r") as handler:
+            return get_document_validation_issues(schema, handler, options["exclusions_content"],
+                                                  max_errors=options["max_errors"],
+                                                  skip_excluded=options["skip_excluded"])
+    if options["stream"]:
+        validator = StreamingValidator(schema, resource_file, options["exclusions_content"],
+                                       skip_excluded=options["skip_excluded"])
+    else:
+        with open(resource_file, "r") as handler:
+            resource = handler.read()
+        validator = YAMLValidator(schema, resource, options["exclusions_content"],
+                                  skip_excluded=options["skip_excluded"])
+    return validator.get_validation_issues(options["max_errors"])
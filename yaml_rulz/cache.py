@@ -0,0 +1,144 @@
+import errno
+import hashlib
+import json
+import os
+import tempfile
+
+from yaml_rulz import __version__
+
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+# Entries are removed down to this fraction of the maximum size, so a full cache is not scanned on every write
+EVICTION_RATIO = 0.75
+ENTRY_SUFFIX = ".json"
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def get_file_digest(filename):
+    digest = hashlib.sha256()
+    with open(filename, "rb") as handler:
+        for chunk in iter(lambda: handler.read(READ_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_namespace(schema_content, exclusions_content=None,  # pylint: disable = too-many-arguments
+                  max_errors=None, skip_excluded=False, stream=False, documents=False):
+    # Digest of every input that affects the issues, except the resource itself
+    return ResultCache.get_key(schema_content, exclusions_content, max_errors, skip_excluded, stream, documents)
+
+
+class ResultCache(object):
+
+    # Validation results are stored as JSON files named after the hash of everything that affects the result.
+    # Entries are touched on every hit and the least recently used ones are removed above max_size bytes.
+    # The directory is scanned once for the total size, which is then kept up to date by the writes of this
+    # cache, and again only when the total goes above max_size.
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self._total_size = None
+
+    @staticmethod
+    def get_key(*parts):
+        digest = hashlib.sha256(__version__.encode("utf-8"))
+        for part in parts:
+            part = str(part).encode("utf-8") if not isinstance(part, bytes) else part
+            # Lengths are hashed too, so that the boundaries of the parts cannot be shifted
+            digest.update(str(len(part)).encode("utf-8") + b":" + part)
+        return digest.hexdigest()
+
+    def get_resource_key(self, namespace, resource_file):
+        return self.get_key(namespace, get_file_digest(resource_file))
+
+    def get(self, key):
+        path = self._get_path(key)
+        try:
+            with open(path, "r") as handler:
+                has_errors, issues = json.load(handler)
+            os.utime(path, None)
+        except (IOError, OSError, ValueError, TypeError):
+            return None
+        return has_errors, issues
+
+    def set(self, key, result):
+        try:
+            content = json.dumps(list(result))
+        except (TypeError, ValueError):
+            # Values that cannot be serialized (e.g. dates) are not cached
+            return
+        try:
+            self._makedirs()
+            handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(handle, "w") as handler:
+                handler.write(content)
+            path = self._get_path(key)
+            replaced_size = self._get_size(path)
+            os.rename(temp_path, path)
+            self._add_size(self._get_size(path) - replaced_size)
+        except (IOError, OSError):
+            pass
+
+    def clear(self):
+        for path, _ in self._list_entries():
+            self._remove(path)
+        self._total_size = 0
+
+    def _add_size(self, size):
+        if self._total_size is None:
+            self._total_size = sum(stat.st_size for _, stat in self._list_entries())
+        else:
+            self._total_size += size
+        if self._total_size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        # Entries written by other processes are only counted here
+        entries = sorted(self._list_entries(), key=lambda entry: entry[1].st_mtime)
+        total_size = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total_size <= self.max_size * EVICTION_RATIO:
+                break
+            self._remove(path)
+            total_size -= stat.st_size
+        self._total_size = total_size
+
+    def _list_entries(self):
+        try:
+            filenames = os.listdir(self.directory)
+        except (IOError, OSError):
+            return []
+        entries = []
+        for filename in filenames:
+            if filename.endswith(ENTRY_SUFFIX):
+                path = os.path.join(self.directory, filename)
+                try:
+                    entries.append((path, os.stat(path)))
+                except OSError:
+                    continue
+        return entries
+
+    def _makedirs(self):
+        try:
+            os.makedirs(self.directory)
+        except OSError as exc:
+            if exc.errno != errno.EEXIST:
+                raise
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    @staticmethod
+    def _get_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -2,62 +2,375 @@
 
 from __future__ import print_function
 from argparse import ArgumentParser
-import json
+from argparse import ArgumentTypeError
+import glob
+import os
 import sys
 
-from prettytable import PrettyTable
-
 from yaml_rulz.errors import YAMLHandlerError
-from yaml_rulz.validator import YAMLValidator
+
+
+# Everything else is imported by the functions needing it, so a short run only loads the modules of its mode, e.g. no
+# PyYAML for a result coming from the cache or the validation server and no prettytable in raw mode
 
 
 TABLE_HEADER = ["Severity", "Message", "Schema", "Criterion", "Resource", "Value", "Ref"]
+BATCH_TABLE_HEADER = ["File"] + TABLE_HEADER
+BATCH_SUMMARY = "{0} of {1} resource files failed validation"
+WATCH_TABLE_HEADER = ["Change", "File"] + TABLE_HEADER
+DOCUMENT_TABLE_HEADER = ["Document"] + TABLE_HEADER
+BATCH_DOCUMENT_TABLE_HEADER = ["File", "Document"] + TABLE_HEADER
+WATCH_SUMMARY = "{0} new and {1} resolved issues"
+STATS_TABLE_HEADER = ["Phase", "Time [ms]"]
+STATS_SUMMARY = ("Rule evaluations: {0}\nRegexp rule evaluations: {1}, pattern compiles: {2}\n"
+                 "Reference scans: {3} ({4} keys)")
+SLOWEST_RULES_TABLE_HEADER = ["Schema", "Rule", "Count", "Time [ms]"]
+STATS_NOT_COLLECTED = "Stats are only collected for a single resource validated in this process"
+LOADER_NAMES = ["csafe", "safe"]
+LOADER_NOT_AVAILABLE = "loader {0!r} is not available"
+# Options of the validation which watch mode does not support
+WATCH_INCOMPATIBLE_OPTIONS = [("stream", "--stream"), ("documents", "--documents"), ("cache_dir", "--cache-dir"),
+                              ("socket", "--socket"), ("stats", "--stats"), ("profile", "--profile"),
+                              ("jobs", "--jobs")]
+WATCH_INCOMPATIBLE = "argument -w/--watch: not allowed with argument {0}"
+NEGATIVE_JOBS = "number of jobs must be 0 or more, got {0!r}"
+NEGATIVE_MAX_ERRORS = "maximum number of errors must be 0 or more, got {0!r}"
 
 
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        __serve(sys.argv[2:])
+        return
     args = __parse_arguments()
-    has_errors, issues = __read_files_and_call_validator(args.schema, args.resource, args.exclusions)
-    if args.raw:
-        print(json.dumps(issues, indent=2))
+    resource_files = __expand_resource_files(args.resource)
+    max_errors = 1 if args.fail_fast else args.max_errors
+    if args.watch:
+        __watch(args, resource_files, max_errors)
+        return
+    stats = __create_stats(args.profile) if args.stats or args.profile else None
+    # Falls back to validating in this process if no server is listening, stats are collected in this process only
+    results = __call_server(args, resource_files, max_errors) if args.socket is not None and stats is None else None
+    if len(resource_files) == 1:
+        has_errors = __validate_resource(args, resource_files[0], max_errors, results, stats)
     else:
-        __print_error_report(issues)
+        if stats is not None:
+            print(STATS_NOT_COLLECTED, file=sys.stderr)
+        if results is None:
+            results = __call_batch_validator(args, resource_files, max_errors)
+        has_errors = any(file_has_errors for _, file_has_errors, _ in results)
+        if args.raw:
+            import json
+            print(json.dumps([{"file": resource_file, "has_errors": file_has_errors, "issues": issues}
+                              for resource_file, file_has_errors, issues in results], indent=2))
+        else:
+            __print_batch_report(results, args.documents)
     if has_errors:
         sys.exit(1)
 
 
-def __print_error_report(issues):
-    table = PrettyTable(TABLE_HEADER)
-    for column in TABLE_HEADER:
-        table.align[column] = "l"
+def __create_stats(profile):
+    from yaml_rulz.stats import ValidationStats
+    return ValidationStats(profile=profile)
+
+
+def __validate_resource(args, resource_file, max_errors, results, stats):
+    if results:
+        _, has_errors, issues = results[0]
+    else:
+        has_errors, issues = __read_files_and_call_validator(args, resource_file, max_errors, stats)
+    if args.raw:
+        import json
+        print(json.dumps(issues, indent=2))
+    else:
+        __print_error_report(issues, args.documents)
+    if stats is not None:
+        __print_stats(stats, args.raw)
+    return has_errors
+
+
+def __print_stats(stats, raw):
+    # Stats are printed to the standard error, so the report on the standard output is not changed
+    info = stats.get_info()
+    if raw:
+        import json
+        print(json.dumps(info, indent=2), file=sys.stderr)
+        return
+    table = __create_table(STATS_TABLE_HEADER)
+    for phase, elapsed in info["phases"].items():
+        table.add_row([phase, "{0:.1f}".format(elapsed * 1000)])
+    print(table, file=sys.stderr)
+    print(STATS_SUMMARY.format(
+        ", ".join("{0} {1}".format(token, count) for token, count in sorted(info["rule_evaluations"].items())),
+        info["regexp_rule_evaluations"], info["pattern_compiles"], info["reference_scans"], info["scanned_keys"],
+    ), file=sys.stderr)
+    if info["slowest_rules"]:
+        table = __create_table(SLOWEST_RULES_TABLE_HEADER)
+        for rule in info["slowest_rules"]:
+            table.add_row([rule["schema"], rule["rule"], rule["count"], "{0:.1f}".format(rule["time"] * 1000)])
+        print(table, file=sys.stderr)
+
+
+def __print_error_report(issues, documents=False):
+    table = __create_table(DOCUMENT_TABLE_HEADER if documents else TABLE_HEADER)
     for issue in issues:
-        table.add_row(
-            [issue.get(issue_key.lower()) if issue_key in TABLE_HEADER[:-1]
-             else "*" if issue.get(issue_key.lower()) else "" for issue_key in TABLE_HEADER]
-        )
+        table.add_row(([issue.get("document")] if documents else []) + __get_table_row(issue))
     table.sortby = "Severity"
     print(table)
 
 
-def __read_files_and_call_validator(schema_file, resource_file, exclusions_file):
-    schema = __read_file(schema_file)
-    resource = __read_file(resource_file)
-    exclusions = __read_file(exclusions_file) if exclusions_file else None
+def __print_batch_report(results, documents=False):
+    table = __create_table(BATCH_DOCUMENT_TABLE_HEADER if documents else BATCH_TABLE_HEADER)
+    for resource_file, _, issues in results:
+        for issue in issues:
+            table.add_row([resource_file] + ([issue.get("document")] if documents else []) + __get_table_row(issue))
+    table.sortby = "File"
+    print(table)
+    print(BATCH_SUMMARY.format(len([result for result in results if result[1]]), len(results)))
+
+
+def __serve(argv):
+    import signal
+    from yaml_rulz.server import ValidationServer
+    args = __parse_serve_arguments(argv)
+    server = ValidationServer(args.socket, args.max_schemas)
+    # Socket file is removed on termination as well
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print("Listening on {0}".format(args.socket))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def __call_server(args, resource_files, max_errors):
+    import socket
+    from yaml_rulz.client import DEFAULT_SOCKET
+    from yaml_rulz.client import send_request
+    # Paths are sent as absolute paths, since the working directory of the server may be different
+    request = {
+        "schema": os.path.abspath(args.schema),
+        "resources": [os.path.abspath(resource_file) for resource_file in resource_files],
+        "exclusions": os.path.abspath(args.exclusions) if args.exclusions else None,
+        "loader": args.loader,
+        "max_errors": max_errors,
+        "skip_excluded": args.skip_excluded,
+        "stream": args.stream,
+        "documents": args.documents,
+    }
+    try:
+        response = send_request(request, args.socket or DEFAULT_SOCKET)
+    except (socket.timeout, socket.error, ValueError):
+        return None
+    if "error" in response:
+        print(response["error"])
+        sys.exit(1)
+    if len(resource_files) == 1 and "error" in response["results"][0]:
+        # Errors of a single resource are not reported as issues without the server either
+        print(response["results"][0]["error"])
+        sys.exit(1)
+    return [(resource_file, result["has_errors"], result["issues"])
+            for resource_file, result in zip(resource_files, response["results"])]
+
+
+def __watch(args, resource_files, max_errors):
+    from yaml_rulz.watch import ValidationWatcher
+    watcher = ValidationWatcher(args.schema, resource_files, args.exclusions, __get_loader(args.loader),
+                                args.skip_excluded, max_errors, args.compact)
+    try:
+        watcher.run(__print_watch_report_raw if args.raw else __print_watch_report)
+    except KeyboardInterrupt:
+        pass
+
+
+def __print_watch_report(changes):
+    table = __create_table(WATCH_TABLE_HEADER)
+    for filename, new_issues, resolved_issues in changes:
+        for change, issues in (("+", new_issues), ("-", resolved_issues)):
+            for issue in issues:
+                table.add_row([change, filename] + __get_table_row(issue))
+    print(table)
+    print(WATCH_SUMMARY.format(sum(len(change[1]) for change in changes), sum(len(change[2]) for change in changes)))
+    sys.stdout.flush()
+
+
+def __print_watch_report_raw(changes):
+    import json
+    print(json.dumps([{"file": filename, "new": new_issues, "resolved": resolved_issues}
+                      for filename, new_issues, resolved_issues in changes], indent=2))
+    sys.stdout.flush()
+
+
+def __create_table(header):
+    from prettytable import PrettyTable
+    table = PrettyTable(header)
+    for column in header:
+        table.align[column] = "l"
+    return table
+
+
+def __get_table_row(issue):
+    return [issue.get(issue_key.lower()) if issue_key in TABLE_HEADER[:-1]
+            else "*" if issue.get(issue_key.lower()) else "" for issue_key in TABLE_HEADER]
+
+
+def __read_files_and_call_validator(args, resource_file, max_errors, stats=None):
+    schema = __read_file(args.schema)
+    exclusions = __read_file(args.exclusions) if args.exclusions else None
+    # Cached results would have no stats
+    cache = __create_cache(args.cache_dir) if args.cache_dir and stats is None else None
     try:
-        validator = YAMLValidator(schema, resource, exclusions)
+        if cache:
+            from yaml_rulz.cache import get_namespace
+            namespace = get_namespace(schema, exclusions, max_errors, args.skip_excluded, args.stream, args.documents)
+            key = cache.get_resource_key(namespace, resource_file)
+            result = cache.get(key)
+            if result is not None:
+                return result
+        result = __call_validator(args, schema, resource_file, exclusions, max_errors, stats)
+        if cache:
+            cache.set(key, result)
+        return result
+    except (IOError, OSError, YAMLHandlerError) as exc:
+        print(exc)
+        sys.exit(1)
+
+
+def __call_validator(args, schema, resource_file, exclusions,  # pylint: disable = too-many-arguments
+                     max_errors, stats):
+    if args.documents:
+        from yaml_rulz.documents import get_document_validation_issues
+        with open(resource_file, "r") as handler:
+            return get_document_validation_issues(schema, handler, exclusions, __get_loader(args.loader), max_errors,
+                                                  args.skip_excluded, args.jobs)
+    validator = __create_validator(args, schema, resource_file, exclusions, stats)
+    return validator.get_validation_issues(max_errors)
+
+
+def __create_cache(cache_dir):
+    from yaml_rulz.cache import ResultCache
+    return ResultCache(cache_dir)
+
+
+def __create_validator(args, schema, resource_file, exclusions, stats):
+    loader = __get_loader(args.loader)
+    if args.stream:
+        from yaml_rulz.streaming import StreamingValidator
+        # Resource is parsed while it is validated, so errors may come from get_validation_issues() as well
+        return StreamingValidator(schema, resource_file, exclusions, loader, args.skip_excluded, stats)
+    if args.jobs != 1:
+        from yaml_rulz.parallel import ParallelValidator
+        return ParallelValidator(schema, __read_file(resource_file), exclusions, loader, args.skip_excluded, args.jobs,
+                                 stats=stats, compact=args.compact)
+    from yaml_rulz.validator import YAMLValidator
+    return YAMLValidator(schema, __read_file(resource_file), exclusions, loader, args.skip_excluded, stats,
+                         args.compact)
+
+
+def __get_loader(loader_name):
+    from yaml_rulz.yaml_handler import LOADERS
+    return LOADERS.get(loader_name)
+
+
+def __call_batch_validator(args, resource_files, max_errors):
+    from yaml_rulz.batch import validate_files
+    schema = __read_file(args.schema)
+    exclusions = __read_file(args.exclusions) if args.exclusions else None
+    try:
+        return validate_files(schema, resource_files, exclusions, args.jobs, __get_loader(args.loader), max_errors,
+                              args.skip_excluded, args.stream, args.cache_dir, args.documents)
     except YAMLHandlerError as exc:
         print(exc)
         sys.exit(1)
-    else:
-        return validator.get_validation_issues()
+
+
+def __expand_resource_files(patterns):
+    resource_files = []
+    for pattern in patterns:
+        # Patterns without matches are kept, so missing files are reported
+        for resource_file in sorted(glob.glob(pattern)) or [pattern]:
+            if resource_file not in resource_files:
+                resource_files.append(resource_file)
+    return resource_files
 
 
 def __parse_arguments():
     argument_parser = ArgumentParser(prog="yaml_rulz")
     argument_parser.add_argument("schema", help="YAML schema file")
-    argument_parser.add_argument("resource", help="YAML resource file to be validated")
+    argument_parser.add_argument("resource", nargs="+",
+                                 help="YAML resource file(s) or glob pattern(s) to be validated")
     argument_parser.add_argument("-x", "--exclusions", help="Exclusions file (optional)")
+    argument_parser.add_argument("-s", "--skip-excluded", action="store_true",
+                                 help="Skips excluded keys instead of reporting their issues as warnings")
     argument_parser.add_argument("-r", "--raw", help="Prints the raw error dictionary", action="store_true")
-    return argument_parser.parse_args()
+    argument_parser.add_argument("-j", "--jobs", type=__parse_jobs, default=1,
+                                 help="Number of worker processes for multiple resources, or for the list groups of a "
+                                      "single resource (0 means all cores)")
+    argument_parser.add_argument("-l", "--loader", choices=LOADER_NAMES,
+                                 help="YAML loader (default: csafe if PyYAML is built with libyaml, otherwise safe)")
+    argument_parser.add_argument("-m", "--max-errors", type=__parse_max_errors,
+                                 help="Stops validating a resource after this many errors")
+    argument_parser.add_argument("-f", "--fail-fast", action="store_true",
+                                 help="Stops validating a resource at the first error (same as --max-errors 1)")
+    argument_parser.add_argument("-S", "--stream", action="store_true",
+                                 help="Validates resources while parsing them, without loading them into memory")
+    argument_parser.add_argument("-d", "--documents", action="store_true",
+                                 help="Validates every document of multi-document resources separately, one at a time")
+    argument_parser.add_argument("-w", "--watch", action="store_true",
+                                 help="Keeps validating the resources when any of the files changes, printing the "
+                                      "new and resolved issues")
+    # The default socket is looked up only when it is used, as finding the temporary directory is slow
+    argument_parser.add_argument("-u", "--socket", nargs="?", const="",
+                                 help="Sends the validation to a server started by 'yaml_rulz serve' "
+                                      "(default socket: yaml_rulz.sock in $XDG_RUNTIME_DIR, or in a private "
+                                      "yaml_rulz-<uid> directory in the temporary directory)")
+    argument_parser.add_argument("-c", "--cache-dir",
+                                 help="Directory for caching the results of unchanged resources (optional)")
+    argument_parser.add_argument("--compact", action="store_true",
+                                 help="Keeps the flat keys of a resource in a compact path table, which takes less "
+                                      "memory but is slower to validate (single resource only)")
+    argument_parser.add_argument("--stats", action="store_true",
+                                 help="Prints the time of the validation phases and rule counters to the standard "
+                                      "error (single resource only)")
+    argument_parser.add_argument("--profile", action="store_true",
+                                 help="Same as --stats, and times every rule to print the slowest ones")
+    args = argument_parser.parse_args()
+    if args.loader is not None and __get_loader(args.loader) is None:
+        argument_parser.error(LOADER_NOT_AVAILABLE.format(args.loader))
+    if args.watch:
+        for name, option in WATCH_INCOMPATIBLE_OPTIONS:
+            if getattr(args, name) != argument_parser.get_default(name):
+                argument_parser.error(WATCH_INCOMPATIBLE.format(option))
+    return args
+
+
+def __parse_jobs(value):
+    jobs = int(value)
+    if jobs < 0:
+        raise ArgumentTypeError(NEGATIVE_JOBS.format(value))
+    return jobs
+
+
+def __parse_max_errors(value):
+    # Negative values would stop at the first error
+    max_errors = int(value)
+    if max_errors < 0:
+        raise ArgumentTypeError(NEGATIVE_MAX_ERRORS.format(value))
+    return max_errors
+
+
+def __parse_serve_arguments(argv):
+    from yaml_rulz.client import DEFAULT_SOCKET
+    from yaml_rulz.server import DEFAULT_MAX_SCHEMAS
+    argument_parser = ArgumentParser(prog="yaml_rulz serve",
+                                     description="Validation server keeping the compiled schemas in memory")
+    argument_parser.add_argument("-u", "--socket", default=DEFAULT_SOCKET,
+                                 help="Unix domain socket to listen on (default: {0})".format(DEFAULT_SOCKET))
+    argument_parser.add_argument("-n", "--max-schemas", type=int, default=DEFAULT_MAX_SCHEMAS,
+                                 help="Number of compiled schemas kept in memory")
+    return argument_parser.parse_args(argv)
 
 
 def __read_file(filename):
@@ -0,0 +1,52 @@
+import json
+import os
+import socket
+import tempfile
+
+
+READ_BUFFER_SIZE = 64 * 1024
+SOCKET_NAME = "yaml_rulz.sock"
+NOT_OWNED_SOCKET = "{0} is not owned by the current user"
+# Seconds to wait for the server on every send and receive, so a hung server is treated as a missing one
+DEFAULT_TIMEOUT = 60.0
+
+
+def get_default_socket():
+    # The runtime directory is private to the user, otherwise the server makes a private directory in the temporary
+    # directory, so other users cannot listen on the default socket
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory:
+        return os.path.join(runtime_directory, SOCKET_NAME)
+    return os.path.join(tempfile.gettempdir(), "yaml_rulz-{0}".format(os.getuid()), SOCKET_NAME)
+
+
+DEFAULT_SOCKET = get_default_socket()
+
+
+def send_request(request, socket_path=DEFAULT_SOCKET, timeout=DEFAULT_TIMEOUT):
+    # Raises socket.error if no server of the current user is listening on socket_path, and socket.timeout if the
+    # server does not answer in time
+    _check_socket_owner(socket_path)
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        chunks = []
+        while not chunks or not chunks[-1].endswith(b"\n"):
+            chunk = client.recv(READ_BUFFER_SIZE)
+            if not chunk:
+                raise socket.error("Connection was closed by the validation server")
+            chunks.append(chunk)
+    finally:
+        client.close()
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def _check_socket_owner(socket_path):
+    try:
+        owner = os.stat(socket_path).st_uid
+    except OSError as exc:
+        raise socket.error(str(exc))
+    if owner != os.getuid():
+        raise socket.error(NOT_OWNED_SOCKET.format(socket_path))
@@ -0,0 +1,129 @@
+from itertools import islice
+from multiprocessing import cpu_count
+from multiprocessing import Pool
+
+import yaml
+
+from yaml_rulz.errors import YAMLHandlerError
+from yaml_rulz.rulebook import ERROR_SEVERITY
+from yaml_rulz.rulebook import ReferenceResolver
+from yaml_rulz.validator import CompiledSchema
+from yaml_rulz.validator import YAMLValidator
+from yaml_rulz.yaml_handler import DEFAULT_LOADER
+from yaml_rulz.yaml_handler import ResourceHandler
+
+
+# Documents sent to the workers at once per worker, so a long stream is not parsed ahead of the validation
+DOCUMENTS_PER_WORKER = 8
+
+# Set by the pool initializer, forked worker processes inherit the compiled schema without pickling it
+_WORKER_STATE = {}
+
+
+class DocumentHandler(ResourceHandler):
+
+    # Handles a document which has already been parsed from a multi-document stream
+
+    def _import_yml(self, yml_content):
+        return yml_content
+
+
+class DocumentValidator(YAMLValidator):
+
+    def _load_resource(self, resource_content, loader):
+        self.resource_handler = DocumentHandler(resource_content, self.schema.separator, loader, self.stats,
+                                                self.compact)
+        self.references = ReferenceResolver(self.resource_handler.flat_yml, self.stats)
+
+
+def iter_documents(resource_stream, loader=None):
+    # Yields (index, document) pairs parsed one by one, resource_stream may be a string or a file object. Empty
+    # documents, e.g. after a trailing document separator, are skipped but still counted.
+    try:
+        for index, document in enumerate(yaml.load_all(resource_stream, Loader=loader or DEFAULT_LOADER)):
+            if document is not None:
+                yield index, document
+    except yaml.YAMLError as exc:
+        raise YAMLHandlerError("Error in resource\n{0}".format(exc))
+
+
+def validate_documents(schema_content, resource_stream, exclusions_content=None,  # pylint: disable = too-many-arguments
+                       loader=None, max_errors=None, skip_excluded=False, jobs=1):
+    # Yields a (document_index, has_errors, issues) tuple per document of the stream, every issue gets the index of
+    # its document as well. max_errors is counted over the whole stream. Parsing errors are raised after the results
+    # of the documents before the error.
+    if not isinstance(schema_content, CompiledSchema):
+        schema_content = CompiledSchema(schema_content, loader=loader)
+    state = {
+        "schema": schema_content,
+        "exclusions_content": exclusions_content,
+        "loader": loader,
+        "max_errors": max_errors,
+        "skip_excluded": skip_excluded,
+    }
+    documents = iter_documents(resource_stream, loader or schema_content.loader)
+    jobs = jobs or cpu_count()
+    if jobs == 1:
+        results = (_validate_document(state, document) for document in documents)
+    else:
+        results = _validate_documents_in_pool(state, documents, jobs)
+    error_count = 0
+    for index, has_errors, issues in results:
+        issues, error_count = _add_document_index(index, issues, error_count, max_errors)
+        if max_errors and error_count >= max_errors:
+            yield index, True, issues
+            return
+        yield index, has_errors, issues
+
+
+def get_document_validation_issues(schema_content, resource_stream,  # pylint: disable = too-many-arguments
+                                   exclusions_content=None, loader=None, max_errors=None, skip_excluded=False, jobs=1):
+    # Same as YAMLValidator.get_validation_issues() for all the documents of the stream
+    all_issues = []
+    has_any_errors = False
+    for _, has_errors, issues in validate_documents(schema_content, resource_stream, exclusions_content, loader,
+                                                    max_errors, skip_excluded, jobs):
+        has_any_errors = has_any_errors or has_errors
+        all_issues.extend(issues)
+    return has_any_errors, all_issues
+
+
+def _add_document_index(index, issues, error_count, max_errors):
+    # Returns the issues up to the last error allowed by max_errors, and the number of errors in the stream so far
+    for position, issue in enumerate(issues):
+        issue["document"] = index
+        if issue["severity"] == ERROR_SEVERITY:
+            error_count += 1
+            if max_errors and error_count >= max_errors:
+                return issues[:position + 1], error_count
+    return issues, error_count
+
+
+def _validate_documents_in_pool(state, documents, jobs):
+    # Documents are validated in batches, so only a few of them are kept in memory at a time
+    pool = Pool(jobs, initializer=_init_worker, initargs=(state,))
+    try:
+        while True:
+            batch = list(islice(documents, jobs * DOCUMENTS_PER_WORKER))
+            if not batch:
+                return
+            for result in pool.map(_validate_document_in_worker, batch):
+                yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _init_worker(state):
+    _WORKER_STATE.update(state)
+
+
+def _validate_document_in_worker(document):
+    return _validate_document(_WORKER_STATE, document)
+
+
+def _validate_document(state, indexed_document):
+    index, document = indexed_document
+    validator = DocumentValidator(state["schema"], document, state["exclusions_content"], state["loader"],
+                                  state["skip_excluded"])
+    return (index,) + validator.get_validation_issues(state["max_errors"])
@@ -0,0 +1,47 @@
+import re
+
+from yaml_rulz.patterns import compile_pattern
+
+
+# Patterns with backreferences cannot be merged into one alternation, since group numbers would shift
+BACKREFERENCE_REGEXP = r"\\[1-9]|\(\?P="
+
+_BACKREFERENCE_PATTERN = re.compile(BACKREFERENCE_REGEXP)
+
+
+class ExclusionMatcher(object):
+
+    def __init__(self, exclusions):
+        self.exclusions = exclusions
+        self._patterns = [compile_pattern(exc) for exc in exclusions]
+        self._combined_pattern = self._combine(exclusions)
+        self._results = {}
+
+    def is_excluded(self, key):
+        try:
+            return self._results[key]
+        except KeyError:
+            result = self._results[key] = self._match(key)
+            return result
+        except TypeError:
+            # Unhashable keys, e.g. prototype lists in missing prototype issues
+            return False
+
+    def _match(self, key):
+        if not self._patterns:
+            return False
+        try:
+            if self._combined_pattern is not None:
+                return self._combined_pattern.match(key) is not None
+            return any(pattern.match(key) for pattern in self._patterns)
+        except TypeError:
+            return False
+
+    @staticmethod
+    def _combine(exclusions):
+        if not exclusions or any(_BACKREFERENCE_PATTERN.search(exc) for exc in exclusions):
+            return None
+        try:
+            return re.compile("|".join("(?:{0})".format(exc) for exc in exclusions))
+        except re.error:
+            return None
@@ -0,0 +1,135 @@
+import math
+import numbers
+import operator
+import re
+
+from yaml_rulz.errors import RuleError
+
+
+TOKEN_REGEXP = r"\s*(?:(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|(\*\*|[-+*/()]))"
+# Powers are rejected before they are computed if their result would need more bits than this
+MAX_POWER_BITS = 4096
+MAX_CACHE_SIZE = 1024
+BINARY_OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+
+_TOKEN_PATTERN = re.compile(TOKEN_REGEXP)
+_CACHE = {}
+
+
+def to_number(value):
+    # Numbers coming from the parsed YAML need no evaluation at all
+    if isinstance(value, numbers.Real):
+        return value
+    return evaluate_expression(str(value))
+
+
+def evaluate_expression(expression):
+    try:
+        return _CACHE[expression]
+    except KeyError:
+        if len(_CACHE) >= MAX_CACHE_SIZE:
+            _CACHE.clear()
+        result = _CACHE[expression] = _ExpressionParser(expression).parse()
+        return result
+
+
+class _ExpressionParser(object):
+
+    # Grammar:
+    #   expression := term (("+" | "-") term)*
+    #   term       := factor (("*" | "/") factor)*
+    #   factor     := ("+" | "-") factor | power
+    #   power      := atom ("**" factor)?
+    #   atom       := NUMBER | "(" expression ")"
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = self._tokenize(expression)
+        self.position = 0
+
+    def parse(self):
+        result = self._parse_expression()
+        if self.position != len(self.tokens):
+            raise RuleError("Unexpected token in expression: {0}".format(self.expression))
+        return result
+
+    def _parse_expression(self):
+        result = self._parse_term()
+        while self._peek() in ("+", "-"):
+            result = self._apply(self._next(), result, self._parse_term())
+        return result
+
+    def _parse_term(self):
+        result = self._parse_factor()
+        while self._peek() in ("*", "/"):
+            result = self._apply(self._next(), result, self._parse_factor())
+        return result
+
+    def _parse_factor(self):
+        if self._peek() == "-":
+            self._next()
+            return -self._parse_factor()
+        if self._peek() == "+":
+            self._next()
+            return self._parse_factor()
+        return self._parse_power()
+
+    def _parse_power(self):
+        base = self._parse_atom()
+        if self._peek() == "**":
+            self._next()
+            exponent = self._parse_factor()
+            if abs(base) > 1 and abs(exponent) * math.log(abs(base), 2) > MAX_POWER_BITS:
+                raise RuleError("Power is too large in expression: {0}".format(self.expression))
+            try:
+                return base ** exponent
+            except (ArithmeticError, ValueError):
+                raise RuleError("Invalid power in expression: {0}".format(self.expression))
+        return base
+
+    def _parse_atom(self):
+        token = self._next()
+        if token == "(":
+            result = self._parse_expression()
+            if self._next() != ")":
+                raise RuleError("Missing closing parenthesis in expression: {0}".format(self.expression))
+            return result
+        if token is None or token in BINARY_OPERATORS or token in ("**", ")"):
+            raise RuleError("Number expected in expression: {0}".format(self.expression))
+        return token
+
+    def _apply(self, token, left, right):
+        try:
+            return BINARY_OPERATORS[token](left, right)
+        except ArithmeticError:
+            raise RuleError("Invalid operation in expression: {0}".format(self.expression))
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        self.position += 1
+        return token
+
+    @staticmethod
+    def _tokenize(expression):
+        tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = _TOKEN_PATTERN.match(expression, position)
+            if not match:
+                raise RuleError("Invalid character in expression: {0}".format(expression))
+            number, symbol = match.groups()
+            if number is not None:
+                tokens.append(float(number) if any(char in number for char in ".eE") else int(number))
+            else:
+                tokens.append(symbol)
+            position = match.end()
+        return tokens
@@ -0,0 +1,143 @@
+from itertools import chain
+
+from yaml_rulz.rulebook import get_rule_response_dict
+from yaml_rulz.validator import MISSING_RESOURCE
+from yaml_rulz.validator import MISSING_SCHEMA
+from yaml_rulz.validator import YAMLValidator
+from yaml_rulz.yaml_handler import ResourceHandler
+
+
+_MISSING = object()
+
+
+def get_changed_keys(old_flat_yml, new_flat_yml):
+    # 1 == True in Python, so the types of the values are compared as well
+    changed_keys = set()
+    for key in set(old_flat_yml).union(new_flat_yml):
+        old_value = old_flat_yml.get(key, _MISSING)
+        new_value = new_flat_yml.get(key, _MISSING)
+        if type(old_value) is not type(new_value) or old_value != new_value:
+            changed_keys.add(key)
+    return changed_keys
+
+
+class IncrementalValidator(YAMLValidator):  # pylint: disable = too-many-instance-attributes
+
+    # Keeps the issues of every scalar and list group of the last validated resource. When the resource is updated,
+    # only the changed keys, the list groups containing them and the keys with rules referencing them are validated.
+
+    def _load_resource(self, resource_content, loader):
+        super(IncrementalValidator, self)._load_resource(resource_content, loader)
+        self.loader = loader
+        self.is_validated = False
+        self.missing_resource_issues = {}
+        self.missing_schema_issues = {}
+        self.scalar_issues = {}
+        self.group_issues = {}
+        # Scalar keys and list group paths by the reference patterns of their rules
+        self.reference_patterns = {}
+        self.scalar_dependents = {}
+        self.group_dependents = {}
+
+    def update(self, resource_content, max_errors=None):
+        if not self.is_validated:
+            self._validate_all()
+        old_flat_yml = self.resource_handler.flat_yml
+        self.resource_handler = ResourceHandler(resource_content, self.schema.separator, self.loader, self.stats,
+                                                self.compact)
+        changed_keys = get_changed_keys(old_flat_yml, self.resource_handler.flat_yml)
+        self.references.update(self.resource_handler.flat_yml, changed_keys)
+        self._update_missing_resource_issues(changed_keys)
+        scalars, groups = self._get_affected_units(changed_keys)
+        for key in scalars:
+            self._validate_scalar(key)
+        for path in groups:
+            self._validate_group(path)
+        return self.get_validation_issues(max_errors)
+
+    def _generate_issues(self):
+        if not self.is_validated:
+            self._validate_all()
+        # Issues are listed in the order of the schema and the resource keys, as by YAMLValidator, since the issues of
+        # new keys are added after the kept ones
+        scalars = self.resource_handler.scalars
+        groups = self.resource_handler.list_handler.groups
+        return chain(
+            (self.missing_resource_issues[key] for key in self.schema_handler.scalars
+             if key in self.missing_resource_issues),
+            (self.missing_schema_issues[key] for key in scalars if key in self.missing_schema_issues),
+            chain.from_iterable(self.scalar_issues[key] for key in scalars if key in self.scalar_issues),
+            chain.from_iterable(self.group_issues[path] for path in groups if path in self.group_issues),
+        )
+
+    def _validate_all(self):
+        for issue in self._find_missing_resource_scalars():
+            self.missing_resource_issues[issue["schema"]] = issue
+        for key in self.resource_handler.scalars:
+            self._validate_scalar(key)
+        for path in self.resource_handler.list_handler.groups:
+            self._validate_group(path)
+        self.is_validated = True
+
+    def _update_missing_resource_issues(self, changed_keys):
+        for key in changed_keys:
+            if key not in self.schema.scalars:
+                continue
+            if key in self.resource_handler.scalars:
+                self.missing_resource_issues.pop(key, None)
+            elif key not in self.missing_resource_issues:
+                self.missing_resource_issues[key] = get_rule_response_dict(schema=key, message=MISSING_RESOURCE)
+
+    def _get_affected_units(self, changed_keys):
+        list_type_pattern = self.resource_handler.list_handler.list_type_pattern
+        scalars = set(key for key in changed_keys if not list_type_pattern.search(key))
+        groups = set(self.schema_handler.list_handler.get_parent_from_key(key)
+                     for key in changed_keys if key not in scalars)
+        for pattern_key, pattern in self.reference_patterns.items():
+            if any(pattern.match(key) for key in changed_keys):
+                scalars.update(self.scalar_dependents.get(pattern_key, ()))
+                groups.update(self.group_dependents.get(pattern_key, ()))
+        return scalars, groups
+
+    def _validate_scalar(self, key):
+        self.missing_schema_issues.pop(key, None)
+        if key not in self.resource_handler.scalars:
+            self.scalar_issues.pop(key, None)
+            return
+        if key not in self.scalar_issues:
+            self._add_dependent(self.scalar_dependents, self._get_scalar_rule_chains(key), key)
+        if key not in self.schema.scalars:
+            self.missing_schema_issues[key] = get_rule_response_dict(resource=key, message=MISSING_SCHEMA)
+        self.scalar_issues[key] = list(
+            self._validate_rules(self.schema.scalar_index, {key: self.resource_handler.scalars[key]})
+        )
+
+    def _validate_group(self, path):
+        resource = self.resource_handler.list_handler.groups.get(path)
+        if resource is None:
+            self.group_issues.pop(path, None)
+            return
+        if path not in self.group_issues:
+            self._add_dependent(self.group_dependents, self._get_group_rule_chains(path), path)
+        self.group_issues[path] = list(self._validate_list_group(path, resource))
+
+    def _add_dependent(self, dependents, rule_chains, unit):
+        # Units are not removed from the dependents, removed scalars and groups are skipped when validated
+        for rule_chain in rule_chains:
+            for rule in rule_chain:
+                if rule.reference_pattern is not None:
+                    self.reference_patterns[rule.reference_pattern.pattern] = rule.reference_pattern
+                    dependents.setdefault(rule.reference_pattern.pattern, set()).add(unit)
+
+    def _get_scalar_rule_chains(self, key):
+        key_mask = self._key_to_mask(self.schema_handler, key)
+        return [rule_chain for _, rule_chain in self.schema.scalar_index.get(key_mask, ())]
+
+    def _get_group_rule_chains(self, path):
+        return [
+            rule_chain
+            for schema_path in self._get_candidate_paths(path)
+            for prototype in self.schema.prototypes[schema_path]
+            for rule_chains in prototype.values()
+            for _, rule_chain in rule_chains
+        ]
@@ -0,0 +1,64 @@
+from multiprocessing import cpu_count
+from multiprocessing import Pool
+
+from yaml_rulz.stats import ValidationStats
+from yaml_rulz.validator import YAMLValidator
+
+
+DEFAULT_CHUNK_SIZE = 256
+
+# Set by the pool initializer, forked worker processes inherit the validator without pickling it
+_WORKER_STATE = {}
+
+
+class ParallelValidator(YAMLValidator):
+
+    # List groups are validated in chunks of chunk_size groups by a pool of worker processes. The results of the chunks
+    # are merged in the order of the groups, so the issues are the same as the ones of YAMLValidator for any number
+    # of workers. Resources with no more than chunk_size groups are validated in this process.
+
+    def __init__(self, schema_content, resource_content,  # pylint: disable = too-many-arguments
+                 exclusions_content=None, loader=None, skip_excluded=False, jobs=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 stats=None, compact=False):
+        super(ParallelValidator, self).__init__(schema_content, resource_content, exclusions_content, loader,
+                                                skip_excluded, stats, compact)
+        self.jobs = jobs or cpu_count()
+        self.chunk_size = chunk_size
+
+    def _validate_lists(self):
+        paths = list(self.resource_handler.list_handler.groups)
+        if self.jobs == 1 or len(paths) <= self.chunk_size:
+            for result in super(ParallelValidator, self)._validate_lists():
+                yield result
+            return
+        chunks = [paths[start:start + self.chunk_size] for start in range(0, len(paths), self.chunk_size)]
+        pool = Pool(min(self.jobs, len(chunks)), initializer=_init_worker, initargs=(self,))
+        try:
+            # Workers are terminated as well when validation is stopped early, e.g. after max_errors
+            for results, stats in pool.imap(_validate_groups_in_worker, chunks):
+                if stats is not None:
+                    self.stats.merge(stats)
+                for result in results:
+                    yield result
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _validate_groups(self, paths):
+        groups = self.resource_handler.list_handler.groups
+        for resource_path in paths:
+            for result in self._validate_list_group(resource_path, groups[resource_path]):
+                yield result
+
+
+def _init_worker(validator):
+    _WORKER_STATE["validator"] = validator
+
+
+def _validate_groups_in_worker(paths):
+    validator = _WORKER_STATE["validator"]
+    if validator.stats is not None:
+        # Only the stats of this chunk are sent back to be merged
+        validator.stats = validator.references.stats = ValidationStats(validator.stats.profile, validator.stats.top)
+    results = list(validator._validate_groups(paths))  # pylint: disable = protected-access
+    return results, validator.stats
@@ -0,0 +1,395 @@
+from array import array
+
+try:
+    from collections.abc import ItemsView
+    from collections.abc import Mapping
+    from collections.abc import ValuesView
+except ImportError:
+    from collections import ItemsView
+    from collections import Mapping
+    from collections import ValuesView
+
+
+HAS_VALUE = 1
+IS_LIST_TYPE = 2
+NO_NODE = -1
+MIN_SLOTS = 64
+
+
+class PathTable(object):  # pylint: disable = too-many-instance-attributes
+
+    # Flat keys are stored as a tree of nodes, every node is a row of parallel arrays holding the id of its interned
+    # segment, its parent and its flags, so the common prefixes of the keys are stored only once. Values are kept in
+    # the order of their first assignment, just like in a dict. Segments are split by the separator, so a key maps to
+    # the same node however it has been added.
+
+    def __init__(self, separator=":"):
+        self.separator = separator
+        self.segments = []
+        self._segment_ids = {}
+        self._parents = array("i")
+        self._segment_of = array("i")
+        self._flags = bytearray()
+        self._values = []
+        self._order = array("i")
+        self._counts = [0] * ((HAS_VALUE | IS_LIST_TYPE) + 1)
+        # Open addressing hash table of the nodes by their parent and segment, it is kept at most half full
+        self._slots = array("i", [NO_NODE]) * MIN_SLOTS
+        # The last parent looked up by its key, the last parent whose key was built and the last key built
+        self._parent_path = (None, NO_NODE)
+        self._parent_key = (NO_NODE, None)
+        self._last_key = (NO_NODE, None)
+
+    def __len__(self):
+        # Number of nodes, including the ones without a value
+        return len(self._values)
+
+    def add(self, key, value, is_list_type=False):
+        node = self.add_path(key)
+        flags = self._flags[node]
+        if flags & HAS_VALUE:
+            self._counts[flags] -= 1
+        else:
+            self._order.append(node)
+        flags = HAS_VALUE | IS_LIST_TYPE if is_list_type else HAS_VALUE
+        self._counts[flags] += 1
+        self._flags[node] = flags
+        self._values[node] = value
+        return node
+
+    def add_path(self, key):
+        parent, segment = self._split_parent(key, True)
+        return self._add_child(parent, segment)
+
+    def find(self, key):
+        cached_node, cached_key = self._last_key
+        if key is cached_key:
+            # Rules look up the key which has just been iterated
+            return cached_node
+        try:
+            parent, segment = self._split_parent(key, False)
+        except AttributeError:
+            return NO_NODE
+        # Segments never contain the separator, so the whole key of a missing parent is not found either
+        segment_id = self._segment_ids.get(segment)
+        if segment_id is None:
+            return NO_NODE
+        return self._slots[self._find_slot(parent, segment_id)]
+
+    def _split_parent(self, key, add):
+        # Keys usually come in the order of the tree, so the parent of the previous key is looked up only once
+        parent_key, separator, segment = key.rpartition(self.separator)
+        if not separator:
+            return NO_NODE, segment
+        cached_key, cached_node = self._parent_path
+        if parent_key == cached_key:
+            return cached_node, segment
+        node, path = NO_NODE, parent_key
+        if cached_key is not None and parent_key.startswith(cached_key + self.separator):
+            # Descending from the cached parent, e.g. while flattening nested items
+            node, path = cached_node, parent_key[len(cached_key) + len(self.separator):]
+        for parent_segment in path.split(self.separator):
+            if add:
+                node = self._add_child(node, parent_segment)
+                continue
+            segment_id = self._segment_ids.get(parent_segment)
+            node = NO_NODE if segment_id is None else self._slots[self._find_slot(node, segment_id)]
+            if node == NO_NODE:
+                return NO_NODE, key
+        self._parent_path = (parent_key, node)
+        return node, segment
+
+    def _add_child(self, parent, segment):
+        segment_id = self._segment_ids.get(segment)
+        if segment_id is None:
+            segment_id = self._segment_ids[segment] = len(self.segments)
+            self.segments.append(segment)
+        slot = self._find_slot(parent, segment_id)
+        node = self._slots[slot]
+        if node == NO_NODE:
+            node = self._slots[slot] = len(self._values)
+            self._parents.append(parent)
+            self._segment_of.append(segment_id)
+            self._flags.append(0)
+            self._values.append(None)
+            if 2 * len(self._values) > len(self._slots):
+                self._resize()
+        return node
+
+    def _find_slot(self, parent, segment_id):
+        # Linear probing, returns the slot of the node or the empty slot where it belongs
+        slots, parents, segment_of = self._slots, self._parents, self._segment_of
+        mask = len(slots) - 1
+        slot = hash((parent, segment_id)) & mask
+        while True:
+            node = slots[slot]
+            if node == NO_NODE or parents[node] == parent and segment_of[node] == segment_id:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _resize(self):
+        self._slots = array("i", [NO_NODE]) * (2 * len(self._slots))
+        for node in range(len(self._values)):
+            self._slots[self._find_slot(self._parents[node], self._segment_of[node])] = node
+
+    def get_key(self, node):
+        parent = self._parents[node]
+        segment = self.segments[self._segment_of[node]]
+        if parent == NO_NODE:
+            key = segment
+        else:
+            cached_node, cached_key = self._parent_key
+            if parent != cached_node:
+                cached_key = self._join_segments(parent)
+                self._parent_key = (parent, cached_key)
+            key = cached_key + self.separator + segment
+        self._last_key = (node, key)
+        return key
+
+    def _join_segments(self, node):
+        segments = []
+        while node != NO_NODE:
+            segments.append(self.segments[self._segment_of[node]])
+            node = self._parents[node]
+        segments.reverse()
+        return self.separator.join(segments)
+
+    def iter_keys(self, nodes=None, mask=0, match=0):
+        for node, key in self._iter_node_keys(nodes, mask, match):
+            self._last_key = (node, key)
+            yield key
+
+    def iter_items(self, nodes=None, mask=0, match=0):
+        values = self._values
+        for node, key in self._iter_node_keys(nodes, mask, match):
+            yield key, values[node]
+
+    def _iter_node_keys(self, nodes, mask, match):
+        # Same as get_key() for the given or all the nodes with matching flags
+        flags, parents, segment_of, segments = self._flags, self._parents, self._segment_of, self.segments
+        separator = self.separator
+        cached_node, cached_key = self._parent_key
+        for node in self._order if nodes is None else nodes:
+            if flags[node] & mask != match:
+                continue
+            parent = parents[node]
+            if parent == NO_NODE:
+                yield node, segments[segment_of[node]]
+                continue
+            if parent != cached_node:
+                cached_node, cached_key = parent, self._join_segments(parent)
+                self._parent_key = (cached_node, cached_key)
+            yield node, cached_key + separator + segments[segment_of[node]]
+
+    def get_value(self, node):
+        return self._values[node]
+
+    def count_nodes(self, mask, match):
+        return sum(count for flags, count in enumerate(self._counts) if flags & mask == match)
+
+    def iter_nodes(self, mask, match):
+        flags = self._flags
+        for node in self._order:
+            if flags[node] & mask == match:
+                yield node
+
+    def has_flags(self, node, mask, match):
+        return self._flags[node] & mask == match
+
+    def get_items(self):
+        return PathView(self, HAS_VALUE, HAS_VALUE)
+
+    def get_scalars(self):
+        return PathView(self, HAS_VALUE | IS_LIST_TYPE, HAS_VALUE)
+
+    def get_list_types(self):
+        return PathView(self, HAS_VALUE | IS_LIST_TYPE, HAS_VALUE | IS_LIST_TYPE)
+
+    def get_groups(self, view, get_parent_from_key):
+        # Groups refer to the nodes of the view, their paths are added to the table as nodes without a value
+        groups = GroupsView(self)
+        for node in view.iter_nodes():
+            groups.add(self.add_path(get_parent_from_key(self.get_key(node))), node)
+        return groups
+
+
+class NodeView(Mapping):
+
+    # Read-only dict-style access to a subset of the nodes of a path table
+
+    __slots__ = ()
+
+    def iter_nodes(self):
+        raise NotImplementedError  # pragma: nocover
+
+    def has_node(self, node):
+        raise NotImplementedError  # pragma: nocover
+
+    def __getitem__(self, key):
+        node = self.table.find(key)
+        if node == NO_NODE or not self.has_node(node):
+            raise KeyError(key)
+        return self.table.get_value(node)
+
+    def __contains__(self, key):
+        node = self.table.find(key)
+        return node != NO_NODE and self.has_node(node)
+
+    def get(self, key, default=None):
+        node = self.table.find(key)
+        if node == NO_NODE or not self.has_node(node):
+            return default
+        return self.table.get_value(node)
+
+    def __iter__(self):
+        return self.table.iter_keys(self.iter_nodes())
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def items(self):
+        return NodeItemsView(self)
+
+    def values(self):
+        return NodeValuesView(self)
+
+    def iter_items(self):
+        return self.table.iter_items(self.iter_nodes())
+
+    def iter_values(self):
+        table = self.table
+        for node in self.iter_nodes():
+            yield table.get_value(node)
+
+
+class NodeItemsView(ItemsView):
+
+    # Keys and values are read from the nodes instead of looking up every key again
+
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class NodeValuesView(ValuesView):
+
+    def __iter__(self):
+        return self._mapping.iter_values()
+
+
+class PathView(NodeView):
+
+    # Nodes with a value whose flags match the mask, e.g. all flat keys, scalars or list types
+
+    __slots__ = ("table", "mask", "match")
+
+    def __init__(self, table, mask, match):
+        self.table = table
+        self.mask = mask
+        self.match = match
+
+    def __len__(self):
+        return self.table.count_nodes(self.mask, self.match)
+
+    def iter_nodes(self):
+        return self.table.iter_nodes(self.mask, self.match)
+
+    def __iter__(self):
+        return self.table.iter_keys(None, self.mask, self.match)
+
+    def iter_items(self):
+        return self.table.iter_items(None, self.mask, self.match)
+
+    def has_node(self, node):
+        return self.table.has_flags(node, self.mask, self.match)
+
+
+class GroupsView(Mapping):  # pylint: disable = too-many-instance-attributes
+
+    # List groups by their paths, the members of a group are chained by their nodes, so a group takes no dict
+
+    __slots__ = ("table", "_paths", "_first", "_last", "_sizes", "_next", "_group_of", "_position_of")
+
+    def __init__(self, table):
+        self.table = table
+        self._paths = array("i")
+        self._first = array("i")
+        self._last = array("i")
+        self._sizes = array("i")
+        self._next = array("i")
+        self._group_of = array("i")
+        self._position_of = array("i")
+
+    def add(self, path, node):
+        # Group paths may be added to the table after the group was created, so the arrays are extended on demand
+        missing = len(self.table) - len(self._next)
+        if missing > 0:
+            for nodes in (self._next, self._group_of, self._position_of):
+                nodes.extend(array("i", [NO_NODE]) * missing)
+        position = self._position_of[path]
+        if position == NO_NODE:
+            position = self._position_of[path] = len(self._paths)
+            self._paths.append(path)
+            self._first.append(node)
+            self._last.append(node)
+            self._sizes.append(1)
+        else:
+            self._next[self._last[position]] = node
+            self._last[position] = node
+            self._sizes[position] += 1
+        self._group_of[node] = position
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __getitem__(self, path):
+        position = self._get_position(path)
+        if position == NO_NODE:
+            raise KeyError(path)
+        return GroupView(self, position)
+
+    def __contains__(self, path):
+        return self._get_position(path) != NO_NODE
+
+    def __iter__(self):
+        for path in self._paths:
+            yield self.table.get_key(path)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def _get_position(self, path):
+        node = self.table.find(path)
+        if node == NO_NODE or node >= len(self._position_of):
+            return NO_NODE
+        return self._position_of[node]
+
+    def iter_members(self, position):
+        node = self._first[position]
+        while node != NO_NODE:
+            yield node
+            node = self._next[node]
+
+    def get_size(self, position):
+        return self._sizes[position]
+
+    def is_member(self, node, position):
+        return node < len(self._group_of) and self._group_of[node] == position
+
+
+class GroupView(NodeView):
+
+    __slots__ = ("table", "groups", "position")
+
+    def __init__(self, groups, position):
+        self.table = groups.table
+        self.groups = groups
+        self.position = position
+
+    def __len__(self):
+        return self.groups.get_size(self.position)
+
+    def iter_nodes(self):
+        return self.groups.iter_members(self.position)
+
+    def has_node(self, node):
+        return self.groups.is_member(node, self.position)
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+import re
+
+
+MAX_CACHE_SIZE = 4096
+
+
+class PatternCache(object):
+
+    def __init__(self, max_size=MAX_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._patterns = OrderedDict()
+
+    def compile(self, pattern, flags=0):
+        key = (pattern, flags)
+        try:
+            compiled = self._patterns.pop(key)
+        except KeyError:
+            compiled = self._compile(pattern, flags)
+            self.misses += 1
+            if len(self._patterns) >= self.max_size:
+                self._patterns.popitem(last=False)
+        else:
+            self.hits += 1
+        # Most recently used patterns are kept at the end
+        self._patterns[key] = compiled
+        return compiled
+
+    @staticmethod
+    def _compile(pattern, flags):
+        try:
+            return re.compile(pattern, flags)
+        except (OverflowError, RuntimeError) as exc:
+            # Huge repeat counts and deeply nested groups are not reported as re.error by the parser
+            raise re.error(str(exc))
+
+    def clear(self):
+        self._patterns.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._patterns),
+            "max_size": self.max_size,
+        }
+
+
+PATTERN_CACHE = PatternCache()
+
+
+def compile_pattern(pattern, flags=0):
+    return PATTERN_CACHE.compile(pattern, flags)
+
+
+def get_cache_info():
+    return PATTERN_CACHE.get_info()
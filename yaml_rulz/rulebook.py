@@ -1,6 +1,9 @@
 import re
 
 from yaml_rulz.errors import RuleError
+from yaml_rulz.expression import to_number
+from yaml_rulz.patterns import compile_pattern
+from yaml_rulz.stats import time_phase
 
 
 YAML_TRUE_REGEXP = r"^(true|yes|on)$"
@@ -28,8 +31,34 @@ IPV6_REGEXP = r"(" \
               r"(25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}[0-9]))"
 CIDR_32 = r"/(([0-9])|([1-2][0-9])|(3[0-2]))"
 CIDR_128 = r"/(([0-9]{1,2})|(1[0-1][0-9])|(12[0-8]))"
+PREDEFINED_REGEXPS = {
+    "num": NUM_REGEXP + EOL_REGEXP,
+    "ipv4": IPV4_REGEXP + EOL_REGEXP,
+    "ipv4_cidr": IPV4_REGEXP + CIDR_32 + EOL_REGEXP,
+    "ipv6": IPV6_REGEXP + EOL_REGEXP,
+    "ipv6_cidr": IPV6_REGEXP + CIDR_128 + EOL_REGEXP,
+}
+BOOLEAN_PATTERNS = (
+    (re.compile(YAML_TRUE_REGEXP, re.IGNORECASE), True),
+    (re.compile(YAML_FALSE_REGEXP, re.IGNORECASE), False),
+)
 ERROR_IN_CRITERION = "Error in given criterion"
 ERROR_SEVERITY = "Error"
+INVALID_CRITERION = object()
+
+
+# Predefined patterns are compiled on first use and shared by every rule
+_PREDEFINED_PATTERNS = {}
+
+
+def get_predefined_pattern(name):
+    try:
+        return _PREDEFINED_PATTERNS[name]
+    except KeyError:
+        if name not in PREDEFINED_REGEXPS:
+            raise RuleError
+        pattern = _PREDEFINED_PATTERNS[name] = re.compile(PREDEFINED_REGEXPS[name])
+        return pattern
 
 
 def raise_rule_error(func):
@@ -54,31 +83,93 @@ def get_rule_response_dict(schema=None, resource=None, criterion=None,  # pylint
     }
 
 
+class ReferenceResolver(object):
+
+    def __init__(self, resource, stats=None):
+        self.resource = resource
+        self.stats = stats
+        self._references = {}
+        self._value_locations = {}
+
+    def resolve(self, pattern):
+        try:
+            return self._references[pattern.pattern]
+        except KeyError:
+            with time_phase(self.stats, "reference scans"):
+                references = dict((key, value) for key, value in self.resource.items() if pattern.match(key))
+            if self.stats is not None:
+                self.stats.add_reference_scan(len(self.resource))
+            self._references[pattern.pattern] = references
+            return references
+
+    def update(self, resource, changed_keys):
+        # Resolved references are kept, only the changed keys are matched again
+        self.resource = resource
+        for pattern, references in self._references.items():
+            compiled_pattern = compile_pattern(pattern)
+            has_new_keys = False
+            for key in changed_keys:
+                if key in resource and compiled_pattern.match(key):
+                    has_new_keys = has_new_keys or key not in references
+                    references[key] = resource[key]
+                elif key in references:
+                    del references[key]
+                else:
+                    continue
+                self._value_locations.pop(pattern, None)
+            if has_new_keys:
+                # New keys are put back in resource order, so duplicates are listed as after a full validation
+                ordered_references = [(key, resource[key]) for key in resource if key in references]
+                references.clear()
+                references.update(ordered_references)
+
+    def get_locations_of_value(self, pattern, value):
+        try:
+            value_locations = self._value_locations[pattern.pattern]
+        except KeyError:
+            value_locations = {}
+            for key, referenced_value in self.resolve(pattern).items():
+                value_locations.setdefault(str(referenced_value), []).append(key)
+            self._value_locations[pattern.pattern] = value_locations
+        return value_locations.get(str(value), [])
+
+
 class RuleBase(object):
 
+    token = ""
     error_msg = ""
 
     def __init__(self, schema_key, resource_key, criterion):
         self.schema_key = schema_key
         self.resource_key = resource_key
         self.criterion = str(criterion)
-
-    def match(self, resource):
-        value = resource.get(self.resource_key)
-        self._resolve_references(resource)
-        if isinstance(self.criterion, dict):
-            if self.resource_key in self.criterion:
-                del self.criterion[self.resource_key]
-            for location, criterion in self.criterion.items():  # pylint: disable = no-member
-                result = self._get_evaluation_result(location, self.resource_key, criterion, value, True)
-                if result:
-                    return result
-        else:
-            return self._get_evaluation_result(self.schema_key, self.resource_key, self.criterion, value, False)
-
-    def _get_evaluation_result(self, schema, resource, criterion, value, ref):  # pylint: disable = too-many-arguments
+        self.compiled_criterion = self._try_to_compile(self.criterion)
+        self.reference_pattern = self._compile_reference_pattern(self.criterion)
+
+    def match(self, resource, resource_key=None, references=None):
+        resource_key = resource_key or self.resource_key
+        references = references or ReferenceResolver(resource)
+        value = resource.get(resource_key)
+        if self._resolve_references(references):
+            return self._match_references(references, resource_key, value)
+        return self._get_evaluation_result(self.schema_key, resource_key, self.compiled_criterion,
+                                           self.criterion, value, False)
+
+    def _match_references(self, references, resource_key, value):
+        for location, criterion in self._resolve_references(references).items():
+            if location == resource_key:
+                continue
+            result = self._get_evaluation_result(location, resource_key, self._try_to_compile(criterion),
+                                                 criterion, value, True)
+            if result:
+                return result
+
+    def _get_evaluation_result(self, schema, resource, compiled_criterion,  # pylint: disable = too-many-arguments
+                               criterion, value, ref):
         try:
-            if not self._evaluate(criterion, value):
+            if compiled_criterion is INVALID_CRITERION:
+                raise RuleError
+            if not self._evaluate(compiled_criterion, value):
                 return get_rule_response_dict(schema=schema,
                                               resource=resource,
                                               criterion=criterion,
@@ -91,12 +182,27 @@ class RuleBase(object):
                                           message=ERROR_IN_CRITERION,
                                           ref=ref)
 
-    def _resolve_references(self, resource):
-        search_result = []
-        for key, value in resource.items():
-            if re.match(self.criterion, key):
-                search_result.append((key, value))
-        self.criterion = dict(search_result) or self.criterion
+    def _resolve_references(self, references):
+        if self.reference_pattern is None:
+            return {}
+        return references.resolve(self.reference_pattern)
+
+    def _try_to_compile(self, criterion):
+        try:
+            return self._compile_criterion(criterion)
+        except Exception:  # pylint: disable = broad-except
+            return INVALID_CRITERION
+
+    @staticmethod
+    def _compile_reference_pattern(criterion):
+        try:
+            return compile_pattern(criterion)
+        except re.error:
+            return None
+
+    @staticmethod
+    def _compile_criterion(criterion):
+        return criterion
 
     def _evaluate(self, criterion, value):
         raise NotImplementedError  # pragma: nocover
@@ -104,87 +210,110 @@ class RuleBase(object):
 
 class OmitRule(RuleBase):
 
+    token = "*"
+
+    # Omission always passes, so references would never change the outcome
+    @staticmethod
+    def _compile_reference_pattern(criterion):
+        return None
+
     def _evaluate(self, criterion, value):
         return True
 
 
 class BooleanRule(RuleBase):
 
+    token = "?"
     error_msg = "Boolean mismatch"
 
     @staticmethod
-    def _eval_criterion(criterion):
-        patterns = {
-            re.compile(YAML_TRUE_REGEXP, re.IGNORECASE): True,
-            re.compile(YAML_FALSE_REGEXP, re.IGNORECASE): False,
-        }
-        for pattern in patterns:
-            if re.match(pattern, criterion):
-                return patterns[pattern]
+    def _compile_criterion(criterion):
+        for pattern, result in BOOLEAN_PATTERNS:
+            if pattern.match(criterion):
+                return result
         raise RuleError
 
     @raise_rule_error
     def _evaluate(self, criterion, value):
-        return self._eval_criterion(criterion) == value
+        return criterion == value
 
 
 class GreaterThanRule(RuleBase):
 
+    token = ">"
     error_msg = "Value must be greater than criterion"
 
+    @staticmethod
+    def _compile_criterion(criterion):
+        return to_number(criterion)
+
     @raise_rule_error
     def _evaluate(self, criterion, value):
-        return eval(str(criterion)) < eval(str(value))
+        return criterion < to_number(value)
 
 
 class LessThanRule(RuleBase):
 
+    token = "<"
     error_msg = "Value must be less than criterion"
 
+    @staticmethod
+    def _compile_criterion(criterion):
+        return to_number(criterion)
+
     @raise_rule_error
     def _evaluate(self, criterion, value):
-        return eval(str(criterion)) > eval(str(value))
+        return criterion > to_number(value)
 
 
 class RegExpRule(RuleBase):
 
+    token = "~"
     error_msg = "Regular expression mismatch"
 
     # Regexp-based rules should not try to resolve references
-    def _resolve_references(self, resource):
-        pass  # pragma: nocover
+    @staticmethod
+    def _compile_reference_pattern(criterion):
+        return None
+
+    @staticmethod
+    def _compile_criterion(criterion):
+        return compile_pattern(criterion)
 
     @raise_rule_error
     def _evaluate(self, criterion, value):
-        return re.match(criterion, str(value)) is not None
+        return criterion.match(str(value)) is not None
 
 
 class PredefinedRegExpRule(RegExpRule):
 
+    token = "@"
     error_msg = "Predefined regular expression mismatch"
 
     @staticmethod
-    def _eval_criterion(criterion):
-        patterns = {
-            "num": NUM_REGEXP + EOL_REGEXP,
-            "ipv4": IPV4_REGEXP + EOL_REGEXP,
-            "ipv4_cidr": IPV4_REGEXP + CIDR_32 + EOL_REGEXP,
-            "ipv6": IPV6_REGEXP + EOL_REGEXP,
-            "ipv6_cidr": IPV6_REGEXP + CIDR_128 + EOL_REGEXP,
-        }
-        if criterion in patterns:
-            return patterns[criterion]
-        raise RuleError
-
-    @raise_rule_error
-    def _evaluate(self, criterion, value):
-        return re.match(self._eval_criterion(criterion), str(value)) is not None
+    def _compile_criterion(criterion):
+        return get_predefined_pattern(criterion)
 
 
 class UniquenessRule(RuleBase):
 
+    token = "!"
     error_msg = "Duplicated value"
 
+    # Duplicates are looked up by value instead of comparing against every referenced item. The keys of a value are
+    # grouped once per pattern, only the issue of the first key lists the group and the others name that key in
+    # schema, so the size of the report is linear in the number of duplicates.
+    def _match_references(self, references, resource_key, value):
+        locations = references.get_locations_of_value(self.reference_pattern, value)
+        if not locations or locations == [resource_key]:
+            return None
+        location = locations[1] if locations[0] == resource_key else locations[0]
+        criterion = references.resolve(self.reference_pattern)[location]
+        result = self._get_evaluation_result(location, resource_key, criterion, criterion, value, True)
+        if result is not None and result["message"] == self.error_msg and locations[0] == resource_key:
+            result["duplicates"] = locations
+        return result
+
     @raise_rule_error
     def _evaluate(self, criterion, value):
         return str(criterion) != str(value)
@@ -0,0 +1,164 @@
+from collections import OrderedDict
+import errno
+import json
+import os
+import socket
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+from yaml_rulz.batch import validate_file
+from yaml_rulz.client import DEFAULT_SOCKET
+from yaml_rulz.errors import YAMLHandlerError
+from yaml_rulz.rulebook import get_rule_response_dict
+from yaml_rulz.validator import CompiledSchema
+from yaml_rulz.watch import get_file_signature
+from yaml_rulz.yaml_handler import LOADERS
+
+
+DEFAULT_MAX_SCHEMAS = 16
+SOCKET_MODE = 0o600
+SOCKET_DIRECTORY_MODE = 0o700
+NOT_PRIVATE_DIRECTORY = "{0} must be owned by the current user and not accessible by others"
+# Paths are decoded as unicode by the JSON module of Python 2
+TEXT_TYPES = (type(u""),)
+BOOLEAN_FIELDS = ("skip_excluded", "stream", "documents")
+
+
+def check_request(request):
+    # Paths given as numbers would be taken for file descriptors of the server
+    if not isinstance(request, dict):
+        raise ValueError("request must be an object")
+    if not isinstance(request.get("schema"), TEXT_TYPES):
+        raise ValueError("schema must be a path")
+    resources = request.get("resources")
+    if not isinstance(resources, list) or not all(isinstance(resource, TEXT_TYPES) for resource in resources):
+        raise ValueError("resources must be a list of paths")
+    for name in ("exclusions", "loader"):
+        if request.get(name) is not None and not isinstance(request[name], TEXT_TYPES):
+            raise ValueError("{0} must be a string".format(name))
+    max_errors = request.get("max_errors")
+    if max_errors is not None and (not isinstance(max_errors, int) or isinstance(max_errors, bool) or max_errors < 0):
+        raise ValueError("max_errors must be an integer of 0 or more")
+    for name in BOOLEAN_FIELDS:
+        if not isinstance(request.get(name, False), bool):
+            raise ValueError("{0} must be a boolean".format(name))
+
+
+class SchemaPool(object):
+
+    # Compiled schemas by file name, compiled again when the file is changed. The least recently used schema is
+    # dropped above max_size schemas.
+
+    def __init__(self, max_size=DEFAULT_MAX_SCHEMAS):
+        self.max_size = max_size
+        self._schemas = OrderedDict()
+
+    def get(self, schema_file, loader=None):
+        key = (schema_file, loader)
+        signature = get_file_signature(schema_file)
+        entry = self._schemas.pop(key, None)
+        if entry is None or entry[0] != signature:
+            with open(schema_file, "r") as handler:
+                entry = signature, CompiledSchema(handler.read(), loader=LOADERS.get(loader))
+            if len(self._schemas) >= self.max_size:
+                self._schemas.popitem(last=False)
+        self._schemas[key] = entry
+        return entry[1]
+
+    def __len__(self):
+        return len(self._schemas)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    # Requests and responses are JSON documents, one per line
+
+    def handle(self):
+        for line in iter(self.rfile.readline, b""):
+            response = self.server.process_validation_request(line)
+            self.wfile.write(json.dumps(response, default=str).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class ValidationServer(socketserver.UnixStreamServer):
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, max_schemas=DEFAULT_MAX_SCHEMAS):
+        self.schema_pool = SchemaPool(max_schemas)
+        self._make_socket_directory(socket_path)
+        self._remove_stale_socket(socket_path)
+        socketserver.UnixStreamServer.__init__(self, socket_path, _RequestHandler)
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        os.chmod(self.server_address, SOCKET_MODE)
+
+    def process_validation_request(self, line):
+        try:
+            request = json.loads(line.decode("utf-8"))
+            check_request(request)
+            schema = self.schema_pool.get(request["schema"], request.get("loader"))
+            exclusions = self._read_file(request["exclusions"]) if request.get("exclusions") else None
+            results = [self._validate_file(schema, resource_file, exclusions, request)
+                       for resource_file in request["resources"]]
+        except (IOError, OSError, YAMLHandlerError) as exc:
+            return {"error": str(exc)}
+        except (KeyError, TypeError, ValueError, AttributeError) as exc:
+            return {"error": "Invalid request: {0!r}".format(exc)}
+        return {"results": results}
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _validate_file(schema, resource_file, exclusions, request):
+        # Errors of the resource are returned as an issue, as in batch validation, and in the error field, which the
+        # client reports instead of the issues for a single resource
+        try:
+            _, has_errors, issues = validate_file(schema, resource_file, exclusions, request.get("max_errors"),
+                                                  request.get("skip_excluded", False), request.get("stream", False),
+                                                  request.get("documents", False))
+        except (IOError, OSError, YAMLHandlerError) as exc:
+            return {"file": resource_file, "has_errors": True, "issues": [get_rule_response_dict(message=str(exc))],
+                    "error": str(exc)}
+        return {"file": resource_file, "has_errors": has_errors, "issues": issues}
+
+    @staticmethod
+    def _make_socket_directory(socket_path):
+        # The directory of the default socket must be private, so other users cannot replace the socket
+        directory = os.path.dirname(os.path.abspath(socket_path))
+        try:
+            os.makedirs(directory, SOCKET_DIRECTORY_MODE)
+        except OSError as exc:
+            if exc.errno != errno.EEXIST:
+                raise
+        if socket_path == DEFAULT_SOCKET:
+            stat = os.stat(directory)
+            if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+                raise socket.error(NOT_PRIVATE_DIRECTORY.format(directory))
+
+    @staticmethod
+    def _remove_stale_socket(socket_path):
+        # A socket file without a listening server is left behind by a killed server
+        if not os.path.exists(socket_path):
+            return
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client.connect(socket_path)
+        except socket.error:
+            os.remove(socket_path)
+        else:
+            raise socket.error("A validation server is already listening on {0}".format(socket_path))
+        finally:
+            client.close()
+
+    @staticmethod
+    def _read_file(filename):
+        with open(filename, "r") as handler:
+            return handler.read()
@@ -0,0 +1,126 @@
+from collections import Counter
+from collections import OrderedDict
+from timeit import default_timer
+
+from yaml_rulz.patterns import PATTERN_CACHE
+
+
+DEFAULT_TOP = 10
+# Every evaluation of these rules matches a regular expression against a value
+REGEXP_TOKENS = ("~", "@")
+
+
+class _NullTimer(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _PhaseTimer(object):
+
+    def __init__(self, stats, phase):
+        self.stats = stats
+        self.phase = phase
+        self.start = None
+
+    def __enter__(self):
+        self.start = default_timer()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.add_time(self.phase, default_timer() - self.start)
+        return False
+
+
+def time_phase(stats, phase):
+    # A no-op context manager is returned when no stats are collected
+    return _NULL_TIMER if stats is None else _PhaseTimer(stats, phase)
+
+
+def time_issues(stats, phase, issues):
+    return issues if stats is None else stats.time_iter(phase, issues)
+
+
+class ValidationStats(object):  # pylint: disable = too-many-instance-attributes
+
+    # Collected only if passed to the validator, which checks for None before every rule evaluation. Rules are timed
+    # one by one in profile mode only, as the timer calls cost about as much as a simple rule.
+
+    def __init__(self, profile=False, top=DEFAULT_TOP):
+        self.profile = profile
+        self.top = top
+        self.phases = OrderedDict()
+        self.rule_evaluations = Counter()
+        self.prototype_candidates = Counter()
+        self.reference_scans = 0
+        self.scanned_keys = 0
+        self.rule_times = {}
+        self._pattern_cache_start = PATTERN_CACHE.hits, PATTERN_CACHE.misses
+
+    def add_time(self, phase, elapsed):
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+
+    def time_iter(self, phase, iterable):
+        # Only the time spent in producing the items is added to the phase
+        iterator = iter(iterable)
+        while True:
+            start = default_timer()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(phase, default_timer() - start)
+                return
+            self.add_time(phase, default_timer() - start)
+            yield item
+
+    def match_rule(self, rule, resource, resource_key, references):
+        self.rule_evaluations[rule.token] += 1
+        if not self.profile:
+            return rule.match(resource, resource_key, references)
+        start = default_timer()
+        result = rule.match(resource, resource_key, references)
+        key = (rule.schema_key, "{0} {1}".format(rule.token, rule.criterion))
+        count, elapsed = self.rule_times.get(key, (0, 0.0))
+        self.rule_times[key] = count + 1, elapsed + default_timer() - start
+        return result
+
+    def add_reference_scan(self, key_count):
+        self.reference_scans += 1
+        self.scanned_keys += key_count
+
+    def merge(self, other):
+        # Adds the counters of the stats collected by another process
+        for phase, elapsed in other.phases.items():
+            self.add_time(phase, elapsed)
+        self.rule_evaluations.update(other.rule_evaluations)
+        self.prototype_candidates.update(other.prototype_candidates)
+        self.reference_scans += other.reference_scans
+        self.scanned_keys += other.scanned_keys
+        for key, (count, elapsed) in other.rule_times.items():
+            old_count, old_elapsed = self.rule_times.get(key, (0, 0.0))
+            self.rule_times[key] = old_count + count, old_elapsed + elapsed
+
+    def get_slowest_rules(self):
+        slowest = sorted(self.rule_times.items(), key=lambda item: item[1][1], reverse=True)[:self.top]
+        return [{"schema": schema_key, "rule": rule, "count": count, "time": elapsed}
+                for (schema_key, rule), (count, elapsed) in slowest]
+
+    def get_info(self):
+        hits, misses = self._pattern_cache_start
+        return {
+            "phases": OrderedDict(self.phases),
+            "rule_evaluations": dict(self.rule_evaluations),
+            "regexp_rule_evaluations": sum(self.rule_evaluations[token] for token in REGEXP_TOKENS),
+            "pattern_compiles": PATTERN_CACHE.misses - misses,
+            "pattern_cache_hits": PATTERN_CACHE.hits - hits,
+            "reference_scans": self.reference_scans,
+            "scanned_keys": self.scanned_keys,
+            "prototype_candidates": dict(self.prototype_candidates),
+            "slowest_rules": self.get_slowest_rules() if self.profile else [],
+        }
@@ -0,0 +1,266 @@
+import re
+
+import yaml
+from yaml.composer import ComposerError
+from yaml.constructor import ConstructorError
+
+from yaml_rulz.errors import YAMLHandlerError
+from yaml_rulz.list_handler import RE_LIST_TYPE
+from yaml_rulz.rulebook import get_rule_response_dict
+from yaml_rulz.rulebook import ReferenceResolver
+from yaml_rulz.stats import time_issues
+from yaml_rulz.stats import time_phase
+from yaml_rulz.validator import MISSING_RESOURCE
+from yaml_rulz.validator import MISSING_SCHEMA
+from yaml_rulz.validator import YAMLValidator
+from yaml_rulz.yaml_handler import DEFAULT_LOADER
+
+
+MAPPING_TAG = "tag:yaml.org,2002:map"
+SEQUENCE_TAG = "tag:yaml.org,2002:seq"
+MERGE_TAG = "tag:yaml.org,2002:merge"
+NON_SPECIFIC_TAGS = (None, "!")
+
+# Value of the items yielded when a mapping or a sequence is finished
+NODE_END = object()
+
+
+class _Frame(object):
+
+    __slots__ = ("path", "prefix", "in_list", "is_mapping", "key", "index")
+
+    def __init__(self, path, prefix, in_list, is_mapping):
+        self.path = path
+        self.prefix = prefix
+        self.in_list = in_list
+        self.is_mapping = is_mapping
+        self.key = None
+        self.index = 0
+
+
+class FlatEventStream(object):
+
+    # Flattens a YAML stream from parser events, so the resource is never loaded as a whole.
+    # Yields the same (key, value, is_list_type) items as YAMLHandlerBase, and (path, NODE_END, False)
+    # when a mapping or sequence is finished.
+
+    def __init__(self, stream, separator=":", loader=None):
+        self.separator = separator
+        self.loader = (loader or DEFAULT_LOADER)(stream)
+        self.list_type_pattern = re.compile(RE_LIST_TYPE.format(separator))
+
+    def __iter__(self):
+        try:
+            for item in self._flatten_events(self._iter_events()):
+                yield item
+        except yaml.YAMLError as exc:
+            raise YAMLHandlerError("Error in resource\n{0}".format(exc))
+        finally:
+            self.loader.dispose()
+
+    def _iter_events(self):
+        # Aliases are expanded by replaying the recorded events of their anchored node
+        anchors = {}
+        recordings = []
+        for event in self._iter_document_events():
+            if isinstance(event, yaml.AliasEvent):
+                events = self._get_anchored_events(anchors, event)
+            elif getattr(event, "anchor", None) is not None:
+                recordings.append((event.anchor, [], [0]))
+                events = (event,)
+            elif not recordings:
+                yield event
+                continue
+            else:
+                events = (event,)
+            for replayed_event in events:
+                self._record_event(replayed_event, recordings, anchors)
+                yield replayed_event
+
+    def _iter_document_events(self):
+        loader = self.loader
+        document_mark = None
+        while not loader.check_event(yaml.StreamEndEvent):
+            event = loader.get_event()
+            if isinstance(event, yaml.DocumentStartEvent):
+                if document_mark is not None:
+                    raise ComposerError("expected a single document in the stream", document_mark,
+                                        "but found another document", event.start_mark)
+                document_mark = event.start_mark
+            elif not isinstance(event, (yaml.StreamStartEvent, yaml.DocumentEndEvent)):
+                yield event
+
+    @staticmethod
+    def _get_anchored_events(anchors, event):
+        try:
+            return anchors[event.anchor]
+        except KeyError:
+            raise ComposerError(None, None, "found undefined alias {0!r}".format(event.anchor), event.start_mark)
+
+    @staticmethod
+    def _record_event(event, recordings, anchors):
+        for _, recorded_events, depth in recordings:
+            recorded_events.append(event)
+            if isinstance(event, yaml.CollectionStartEvent):
+                depth[0] += 1
+            elif isinstance(event, yaml.CollectionEndEvent):
+                depth[0] -= 1
+        while recordings and recordings[-1][2][0] == 0:
+            anchor, recorded_events, _ = recordings.pop()
+            anchors[anchor] = recorded_events
+
+    def _flatten_events(self, events):
+        separator = self.separator
+        stack = []
+        is_empty = True
+        for event in events:
+            is_empty = False
+            if isinstance(event, yaml.CollectionEndEvent):
+                frame = stack.pop()
+                yield frame.path, NODE_END, False
+                continue
+            if not stack:
+                key, is_list_type = "", False
+            else:
+                frame = stack[-1]
+                if frame.is_mapping and frame.key is None:
+                    frame.key = self._construct_key(event)
+                    continue
+                key, is_list_type = self._get_item_key(frame)
+            if isinstance(event, yaml.ScalarEvent):
+                yield key, self._construct_scalar(event), is_list_type
+            elif isinstance(event, yaml.SequenceStartEvent):
+                self._check_collection_tag(event, SEQUENCE_TAG)
+                yield key, [], is_list_type
+                stack.append(_Frame(key, key + separator, True, False))
+            else:
+                self._check_collection_tag(event, MAPPING_TAG)
+                stack.append(_Frame(key, key + separator if stack else "", is_list_type, True))
+        if is_empty:
+            yield "", None, False
+
+    def _get_item_key(self, frame):
+        if frame.is_mapping:
+            key, frame.key = frame.key, None
+            return frame.prefix + key, frame.in_list or self.list_type_pattern.search(key) is not None
+        index, frame.index = frame.index, frame.index + 1
+        return frame.prefix + str(index), True
+
+    def _construct_key(self, event):
+        if not isinstance(event, yaml.ScalarEvent):
+            raise ConstructorError("while flattening a mapping", None,
+                                   "found a non-scalar key, which is not supported in streaming mode",
+                                   event.start_mark)
+        if self._resolve_scalar_tag(event) == MERGE_TAG:
+            raise ConstructorError("while flattening a mapping", None,
+                                   "found a merge key, which is not supported in streaming mode",
+                                   event.start_mark)
+        return str(self._construct_scalar(event))
+
+    def _construct_scalar(self, event):
+        # Constructors are called directly, since the loader would keep every constructed node
+        loader = self.loader
+        tag = self._resolve_scalar_tag(event)
+        node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, event.style)
+        constructor = loader.yaml_constructors.get(tag, loader.yaml_constructors[None])
+        return constructor(loader, node)
+
+    def _resolve_scalar_tag(self, event):
+        if event.tag in NON_SPECIFIC_TAGS:
+            return self.loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        return event.tag
+
+    @staticmethod
+    def _check_collection_tag(event, default_tag):
+        if event.tag not in NON_SPECIFIC_TAGS and event.tag != default_tag:
+            raise ConstructorError(None, None,
+                                   "found tag {0}, which is not supported in streaming mode".format(event.tag),
+                                   event.start_mark)
+
+
+class StreamingValidator(YAMLValidator):
+
+    # Validates a resource file while it is being parsed. Only the values of keys that are referenced by
+    # rules and the items of the currently open list groups are kept in memory.
+
+    def _load_resource(self, resource_content, loader):
+        # Resource content is the path of the resource file, which is read on every validation pass
+        self.resource_file = resource_content
+        self.loader = loader
+        self.references = ReferenceResolver({}, self.stats)
+
+    def _generate_issues(self):
+        with time_phase(self.stats, "reference pass"):
+            self.references = ReferenceResolver(self._collect_referenced_values(), self.stats)
+        return time_issues(self.stats, "stream validation", self._validate_stream())
+
+    def _validate_stream(self):
+        seen_scalars = set()
+        groups = {}
+        closing_paths = {}
+        sequences = set()
+        for key, value, is_list_type in self._iter_resource():
+            if value is NODE_END:
+                sequences.discard(key)
+                results = self._close_groups(key, groups, closing_paths)
+            elif is_list_type:
+                results = self._add_to_group(key, value, groups, closing_paths, sequences)
+            else:
+                results = self._validate_scalar(key, value, seen_scalars)
+            if isinstance(value, list):
+                sequences.add(key)
+            for result in results:
+                yield result
+        for parent, resource in groups.items():
+            for result in self._validate_list_group(parent, resource):
+                yield result
+        for key in self.schema.scalars:
+            if key not in seen_scalars:
+                yield get_rule_response_dict(schema=key, message=MISSING_RESOURCE)
+
+    def _validate_scalar(self, key, value, seen_scalars):
+        if key in self.schema.scalars:
+            seen_scalars.add(key)
+        else:
+            yield get_rule_response_dict(resource=key, message=MISSING_SCHEMA)
+        for result in self._validate_rules(self.schema.scalar_index, {key: value}):
+            yield result
+
+    def _close_groups(self, path, groups, closing_paths):
+        for parent in closing_paths.pop(path, ()):
+            for result in self._validate_list_group(parent, groups.pop(parent)):
+                yield result
+
+    def _add_to_group(self,  # pylint: disable = too-many-arguments
+                      key, value, groups, closing_paths, sequences):
+        # Keys sharing only a string prefix with the parent path (e.g. "1st" next to "1") belong to the same group,
+        # and they can come after the node of the parent path is finished if the parent is a mapping key. Such groups
+        # are complete when the container of the parent ends, or when the stream ends if that is not a container.
+        # Items of a sequence have no such siblings, so their groups are complete with the node of the item.
+        parent = self.schema_handler.list_handler.get_parent_from_key(key)
+        container = parent.rpartition(self.schema.separator)[0]
+        is_sequence_item = container in sequences
+        if parent not in groups:
+            if is_sequence_item and key == parent:
+                # Scalar sequence items are complete at once, no node end follows them
+                return self._validate_list_group(parent, {key: value})
+            groups[parent] = {}
+            closing_paths.setdefault(parent if is_sequence_item else container, []).append(parent)
+        groups[parent][key] = value
+        return ()
+
+    def _collect_referenced_values(self):
+        patterns = dict((rule.reference_pattern.pattern, rule.reference_pattern)
+                        for rule in self.schema.iter_rules() if rule.reference_pattern is not None)
+        if not patterns:
+            return {}
+        patterns = list(patterns.values())
+        return dict(
+            (key, value) for key, value, _ in self._iter_resource()
+            if value is not NODE_END and any(pattern.match(key) for pattern in patterns)
+        )
+
+    def _iter_resource(self):
+        with open(self.resource_file, "r") as stream:
+            for item in FlatEventStream(stream, self.schema.separator, self.loader):
+                yield item
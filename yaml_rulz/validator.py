@@ -1,14 +1,19 @@
 from itertools import chain
 import re
 
+from yaml_rulz.exclusions import ExclusionMatcher
 from yaml_rulz.rulebook import get_rule_response_dict
+from yaml_rulz.rulebook import ERROR_SEVERITY
 from yaml_rulz.rulebook import BooleanRule
 from yaml_rulz.rulebook import GreaterThanRule
 from yaml_rulz.rulebook import LessThanRule
 from yaml_rulz.rulebook import OmitRule
 from yaml_rulz.rulebook import PredefinedRegExpRule
+from yaml_rulz.rulebook import ReferenceResolver
 from yaml_rulz.rulebook import RegExpRule
 from yaml_rulz.rulebook import UniquenessRule
+from yaml_rulz.stats import time_issues
+from yaml_rulz.stats import time_phase
 from yaml_rulz.yaml_handler import ResourceHandler
 from yaml_rulz.yaml_handler import SchemaHandler
 
@@ -21,7 +26,7 @@ RULE_SEPARATOR_REGEXP = r"\s+\|\s+"
 EOL_REGEXP = r"$"
 
 
-class YAMLValidator(object):
+class CompiledSchema(object):  # pylint: disable = too-many-instance-attributes
 
     known_rule_tokens = {
         "*": OmitRule,
@@ -33,37 +38,148 @@ class YAMLValidator(object):
         "!": UniquenessRule,
     }
 
-    def __init__(self, schema_content, resource_content, exclusions_content=None):
-        self.schema_handler = SchemaHandler(schema_content)
-        self.resource_handler = ResourceHandler(resource_content)
+    def __init__(self, schema_content, separator=":", loader=None, stats=None):
+        self.separator = separator
+        self.loader = loader
+        self.schema_handler = SchemaHandler(schema_content, separator, loader, stats)
+        with time_phase(stats, "schema compile"):
+            self.scalars = self._compile_rule_chains(self.schema_handler.scalars)
+            self.scalar_index = self._index_rule_chains(self.scalars)
+            self.prototypes = dict(
+                (path, self._compile_prototypes(group))
+                for path, group in self.schema_handler.list_handler.groups.items()
+            )
+            self.prototype_paths, self.prototype_index = self._index_prototypes(self.prototypes)
+
+    def validate(self, resource_content, exclusions_content=None,  # pylint: disable = too-many-arguments
+                 max_errors=None, skip_excluded=False, stats=None):
+        validator = YAMLValidator(self, resource_content, exclusions_content, skip_excluded=skip_excluded,
+                                  stats=stats)
+        return validator.get_validation_issues(max_errors)
+
+    def _compile_rule_chains(self, flat_schema):
+        return dict(
+            (schema_key, [self._get_rule(schema_key, rule_expression)
+                          for rule_expression in self._split_rules(rule_chain)])
+            for schema_key, rule_chain in flat_schema.items()
+        )
+
+    def _index_rule_chains(self, compiled_rules):
+        # Schema keys are indexed by their list index mask, so a resource key can be resolved by a single lookup
+        index = {}
+        for schema_key, rule_chain in compiled_rules.items():
+            mask = self.schema_handler.list_handler.get_key_mask(schema_key)
+            index.setdefault(mask, []).append((schema_key, rule_chain))
+        return index
+
+    def _compile_prototypes(self, group):
+        prototype = self._compile_rule_chains(group)
+        if re.search(self.schema_handler.list_handler.list_item_regexp + EOL_REGEXP, list(prototype)[0]):
+            prototypes = [{key: value} for key, value in prototype.items()]
+        else:
+            prototypes = [prototype]
+        return [self._index_rule_chains(prototype) for prototype in prototypes]
+
+    def _index_prototypes(self, prototypes):
+        # Prototypes are indexed by the mask of their group path and by their shape (the set of their masked keys),
+        # so the prototypes matching a resource list item are found by a single lookup
+        paths = {}
+        index = {}
+        for path, group_prototypes in prototypes.items():
+            path_mask = self.schema_handler.list_handler.get_key_mask(path)
+            paths.setdefault(path_mask, []).append(path)
+            for prototype in group_prototypes:
+                index.setdefault((path_mask, frozenset(prototype)), []).append(prototype)
+        return paths, index
+
+    def _get_rule(self, schema_key, rule_expression):
+        try:
+            token, criterion = rule_expression.split(" ", 1)
+        except (ValueError, AttributeError):
+            return OmitRule(schema_key, None, None)
+        else:
+            if token in self.known_rule_tokens:
+                return self.known_rule_tokens[token](schema_key, None, criterion)
+            return OmitRule(schema_key, None, None)
+
+    @staticmethod
+    def _split_rules(rule_chain):
+        return re.split(RULE_SEPARATOR_REGEXP, str(rule_chain))
+
+    def iter_rules(self):
+        for rule_chain in self.scalars.values():
+            for rule in rule_chain:
+                yield rule
+        for prototypes in self.prototypes.values():
+            for prototype in prototypes:
+                for rule_chains in prototype.values():
+                    for _, rule_chain in rule_chains:
+                        for rule in rule_chain:
+                            yield rule
+
+
+def compile_schema(schema_content, separator=":", loader=None):
+    return CompiledSchema(schema_content, separator, loader)
+
+
+class YAMLValidator(object):  # pylint: disable = too-many-instance-attributes
+
+    def __init__(self, schema_content, resource_content,  # pylint: disable = too-many-arguments
+                 exclusions_content=None, loader=None, skip_excluded=False, stats=None, compact=False):
+        # Stats are only collected if a ValidationStats object is passed
+        self.stats = stats
+        self.compact = compact
+        if isinstance(schema_content, CompiledSchema):
+            self.schema = schema_content
+        else:
+            self.schema = CompiledSchema(schema_content, loader=loader, stats=stats)
+        self.schema_handler = self.schema.schema_handler
+        self._load_resource(resource_content, loader or self.schema.loader)
         self.exclusions = YAMLValidator._import_exclusions(exclusions_content)
+        self.exclusion_matcher = ExclusionMatcher(self.exclusions)
+        # Excluded keys are not evaluated and their issues are dropped instead of being reported as warnings
+        self.skip_excluded = skip_excluded
+
+    def get_validation_issues(self, max_errors=None):
+        issues = list(self.iter_validation_issues(max_errors))
+        return any(issue["severity"] == ERROR_SEVERITY for issue in issues), issues
+
+    def iter_validation_issues(self, max_errors=None):
+        # Validation stops as soon as max_errors issues with error severity have been yielded
+        error_count = 0
+        for issue in self._generate_issues():
+            self._update_severity(issue)
+            if self.skip_excluded and issue["severity"] == WARNING_SEVERITY:
+                continue
+            yield issue
+            if issue["severity"] == ERROR_SEVERITY:
+                error_count += 1
+                if max_errors and error_count >= max_errors:
+                    return
+
+    def _load_resource(self, resource_content, loader):
+        self.resource_handler = ResourceHandler(resource_content, self.schema.separator, loader, self.stats,
+                                                self.compact)
+        self.references = ReferenceResolver(self.resource_handler.flat_yml, self.stats)
+
+    def _generate_issues(self):
+        return chain(
+            time_issues(self.stats, "missing keys", self._find_missing_resource_scalars()),
+            time_issues(self.stats, "missing keys", self._find_missing_schema_scalars()),
+            time_issues(self.stats, "scalar rules", self._validate_scalars()),
+            time_issues(self.stats, "list rules", self._validate_lists()),
+        )
 
-    def get_validation_issues(self):
-        issues = [issue for issue in chain(
-            self._find_missing_resource_scalars(),
-            self._find_missing_schema_scalars(),
-            self._validate_scalars(),
-            self._validate_lists(),
-        )]
-        return self._update_severity(issues)
-
-    def _update_severity(self, issues):
-        has_errors = False
-        for issue in issues:
-            if self._is_excluded(issue["schema"]) or self._is_excluded(issue["resource"]):
-                issue["severity"] = WARNING_SEVERITY
-            else:
-                has_errors = True
-        return has_errors, issues
+    def _update_severity(self, issue):
+        if self._is_excluded(issue["schema"]) or self._is_excluded(issue["resource"]):
+            issue["severity"] = WARNING_SEVERITY
+        return issue
 
     def _is_excluded(self, key):
-        try:
-            for exc in self.exclusions:
-                if re.match(exc, key):
-                    return True
-            return False
-        except TypeError:
-            return False
+        return self.exclusion_matcher.is_excluded(key)
+
+    def _is_skipped(self, key):
+        return self.skip_excluded and self._is_excluded(key)
 
     def _find_missing_resource_scalars(self):
         for issue in self._yield_missing_scalar_error(self.schema_handler,
@@ -77,73 +193,67 @@ class YAMLValidator(object):
                                                       MISSING_SCHEMA):
             yield issue
 
-    def _validate_rules(self, flat_schema, flat_resource):
+    def _validate_rules(self, schema_index, flat_resource):
+        stats = self.stats
         for resource_key in flat_resource:
-            key_mask = self._key_to_mask(self.resource_handler, resource_key)
-            for schema_key in flat_schema:
-                if re.match(key_mask + EOL_REGEXP, schema_key):
-                    rule_chain = self._split_rules(flat_schema[schema_key])
-                    for rule_expression in rule_chain:
-                        rule = self._get_rule(schema_key, resource_key, rule_expression)
-                        # Whole resource must be passed to match() because of possible references in rules
-                        result = rule.match(self.resource_handler.flat_yml)
-                        if result:
-                            yield result
+            if self._is_skipped(resource_key):
+                continue
+            key_mask = self._key_to_mask(self.schema_handler, resource_key)
+            for schema_key, rule_chain in schema_index.get(key_mask, ()):
+                if self._is_skipped(schema_key):
+                    continue
+                for rule in rule_chain:
+                    # References are resolved from the whole resource, not just from the flat_resource subset
+                    if stats is None:
+                        result = rule.match(flat_resource, resource_key, self.references)
+                    else:
+                        result = stats.match_rule(rule, flat_resource, resource_key, self.references)
+                    if result:
+                        yield result
 
     def _validate_scalars(self):
-        for result in self._validate_rules(self.schema_handler.scalars, self.resource_handler.scalars):
+        for result in self._validate_rules(self.schema.scalar_index, self.resource_handler.scalars):
             yield result
 
     def _validate_lists(self):
         for resource_path, resource in self.resource_handler.list_handler.groups.items():
-            # Collect prototypes
-            path_mask = self._key_to_mask(self.resource_handler, resource_path)
-            prototype_candidates = [
-                prototype_groups
-                for schema_path, prototype_groups in self.schema_handler.list_handler.groups.items()
-                if re.match(path_mask + EOL_REGEXP, schema_path)
-            ]
-            prototypes = self._filter_matching_prototypes(resource, prototype_candidates)
-            if not prototypes:
-                yield get_rule_response_dict(
-                    schema=prototype_candidates,
-                    resource=resource_path,
-                    message=MISSING_PROTOTYPE,
-                )
-            # Evaluate prototypes
-            prototype_failure_count = 0
-            prototype_failures = []
-            for prototype in prototypes:
-                result = [failure for failure in self._validate_rules(prototype, resource)]
-                if result:
-                    prototype_failures.extend(result)
-                    prototype_failure_count += 1
-            if prototype_failure_count >= len(prototypes):
-                for failure in prototype_failures:
-                    yield failure
-
-    def _filter_matching_prototypes(self, resource, prototypes):
-        matching_prototypes = []
-        masked_resource_keys = [self._key_to_mask(self.schema_handler, key) for key in resource.keys()]
+            for result in self._validate_list_group(resource_path, resource):
+                yield result
+
+    def _validate_list_group(self, resource_path, resource):
+        if self._is_skipped(resource_path):
+            return
+        # Collect prototypes
+        prototypes = self._get_matching_prototypes(resource_path, resource)
+        if self.stats is not None:
+            # Number of resource list groups by the number of prototypes they are validated against
+            self.stats.prototype_candidates[len(prototypes)] += 1
+        if not prototypes:
+            yield get_rule_response_dict(
+                schema=[dict(self.schema_handler.list_handler.groups[path])
+                        for path in self._get_candidate_paths(resource_path)],
+                resource=resource_path,
+                message=MISSING_PROTOTYPE,
+            )
+        # Evaluate prototypes
+        prototype_failure_count = 0
+        prototype_failures = []
         for prototype in prototypes:
-            masked_prototype_keys = [self._key_to_mask(self.schema_handler, key) for key in prototype.keys()]
-            if set(masked_prototype_keys) == set(masked_resource_keys):
-                if re.search(self.schema_handler.list_handler.list_item_regexp + EOL_REGEXP, list(prototype)[0]):
-                    for key, value in prototype.items():
-                        matching_prototypes.append({key: value})
-                else:
-                    matching_prototypes.append(prototype)
-        return matching_prototypes
-
-    def _get_rule(self, schema_key, resource_key, rule_expression):
-        try:
-            token, criterion = rule_expression.split(" ", 1)
-        except (ValueError, AttributeError):
-            return OmitRule(schema_key, resource_key, None)
-        else:
-            if token in self.known_rule_tokens:
-                return self.known_rule_tokens[token](schema_key, resource_key, criterion)
-            return OmitRule(schema_key, resource_key, None)
+            result = [failure for failure in self._validate_rules(prototype, resource)]
+            if result:
+                prototype_failures.extend(result)
+                prototype_failure_count += 1
+        if prototype_failure_count >= len(prototypes):
+            for failure in prototype_failures:
+                yield failure
+
+    def _get_candidate_paths(self, resource_path):
+        return self.schema.prototype_paths.get(self._key_to_mask(self.schema_handler, resource_path), [])
+
+    def _get_matching_prototypes(self, resource_path, resource):
+        path_mask = self._key_to_mask(self.schema_handler, resource_path)
+        signature = frozenset(self._key_to_mask(self.schema_handler, key) for key in resource)
+        return self.schema.prototype_index.get((path_mask, signature), [])
 
     @staticmethod
     def _yield_missing_scalar_error(outer_handler, inner_handler, message):
@@ -161,10 +271,6 @@ class YAMLValidator(object):
             return []
         return [exc.strip() for exc in exclusions_content.splitlines() if exc]
 
-    @staticmethod
-    def _split_rules(rule_chain):
-        return re.split(RULE_SEPARATOR_REGEXP, str(rule_chain))
-
     @staticmethod
     def _key_to_mask(handler, key):
-        return re.sub(handler.list_handler.list_item_regexp, handler.list_handler.list_item_regexp, key)
+        return handler.list_handler.get_key_mask(key)
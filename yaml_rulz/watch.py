@@ -0,0 +1,124 @@
+import json
+import os
+import time
+
+from yaml_rulz.errors import YAMLHandlerError
+from yaml_rulz.incremental import IncrementalValidator
+from yaml_rulz.rulebook import get_rule_response_dict
+from yaml_rulz.validator import CompiledSchema
+
+
+DEFAULT_INTERVAL = 0.5
+
+
+def get_issue_key(issue):
+    return json.dumps(issue, sort_keys=True, default=str)
+
+
+def get_file_signature(filename):
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size, stat.st_ino
+
+
+class FileWatcher(object):
+
+    # Files are polled with stat() only, so watching works on every platform and file system without dependencies
+
+    def __init__(self, filenames):
+        self.signatures = dict((filename, get_file_signature(filename)) for filename in filenames)
+
+    def poll(self):
+        changed_files = []
+        for filename, signature in self.signatures.items():
+            current_signature = get_file_signature(filename)
+            if current_signature != signature:
+                self.signatures[filename] = current_signature
+                changed_files.append(filename)
+        return changed_files
+
+
+class ValidationWatcher(object):  # pylint: disable = too-many-instance-attributes
+
+    # Keeps the compiled schema and an incremental validator per resource, and reports the issues which are new
+    # or resolved since the previous validation as (filename, new_issues, resolved_issues) changes.
+
+    def __init__(self, schema_file, resource_files, exclusions_file=None,  # pylint: disable = too-many-arguments
+                 loader=None, skip_excluded=False, max_errors=None, compact=False):
+        self.schema_file = schema_file
+        self.resource_files = resource_files
+        self.exclusions_file = exclusions_file
+        self.loader = loader
+        self.skip_excluded = skip_excluded
+        self.max_errors = max_errors
+        self.compact = compact
+        self.file_watcher = FileWatcher([schema_file] + resource_files + ([exclusions_file] if exclusions_file else []))
+        self.schema = None
+        self.exclusions = None
+        self.validators = {}
+        self.issues = {}
+
+    def validate(self):
+        # Everything is validated again, e.g. at start or when the schema or the exclusions are changed
+        self.validators = {}
+        try:
+            self.schema = CompiledSchema(self._read_file(self.schema_file), loader=self.loader)
+            self.exclusions = self._read_file(self.exclusions_file) if self.exclusions_file else None
+        except (IOError, OSError, YAMLHandlerError) as exc:
+            self.schema = None
+            changes = [self._set_issues(self.schema_file, [get_rule_response_dict(message=str(exc))])]
+            return changes + [self._set_issues(resource_file, []) for resource_file in self.resource_files]
+        changes = [self._set_issues(self.schema_file, [])]
+        return changes + [self._validate_resource(resource_file) for resource_file in self.resource_files]
+
+    def check(self):
+        changed_files = self.file_watcher.poll()
+        if not changed_files:
+            return []
+        if self.schema is None or self.schema_file in changed_files or self.exclusions_file in changed_files:
+            changes = self.validate()
+        else:
+            changes = [self._validate_resource(resource_file) for resource_file in changed_files]
+        return [change for change in changes if change[1] or change[2]]
+
+    def run(self, callback, interval=DEFAULT_INTERVAL, max_checks=None):
+        callback([change for change in self.validate() if change[1] or change[2]])
+        checks = 0
+        while max_checks is None or checks < max_checks:
+            time.sleep(interval)
+            changes = self.check()
+            if changes:
+                callback(changes)
+            checks += 1
+
+    def _validate_resource(self, resource_file):
+        try:
+            content = self._read_file(resource_file)
+            validator = self.validators.get(resource_file)
+            if validator is None:
+                validator = IncrementalValidator(self.schema, content, self.exclusions, self.loader,
+                                                 self.skip_excluded, compact=self.compact)
+                _, issues = validator.get_validation_issues(self.max_errors)
+                self.validators[resource_file] = validator
+            else:
+                _, issues = validator.update(content, self.max_errors)
+        except (IOError, OSError, YAMLHandlerError) as exc:
+            issues = [get_rule_response_dict(message=str(exc))]
+        return self._set_issues(resource_file, issues)
+
+    def _set_issues(self, filename, issues):
+        old_issues = self.issues.get(filename, {})
+        new_issues = dict((get_issue_key(issue), issue) for issue in issues)
+        self.issues[filename] = new_issues
+        return (
+            filename,
+            [issue for key, issue in new_issues.items() if key not in old_issues],
+            [issue for key, issue in old_issues.items() if key not in new_issues],
+        )
+
+    @staticmethod
+    def _read_file(filename):
+        with open(filename, "r") as handler:
+            return handler.read()
@@ -1,43 +1,85 @@
+import re
+
 import yaml
 
 from yaml_rulz.errors import YAMLHandlerError
 from yaml_rulz.list_handler import ListHandler
+from yaml_rulz.list_handler import RE_LIST_TYPE
+from yaml_rulz.stats import time_phase
+
+
+LOADERS = {"safe": yaml.SafeLoader}
+if getattr(yaml, "__with_libyaml__", False):
+    LOADERS["csafe"] = yaml.CSafeLoader
+DEFAULT_LOADER = LOADERS.get("csafe", yaml.SafeLoader)
 
 
 class YAMLHandlerBase(object):
 
     role = ""
 
-    def __init__(self, yml_content, separator=":"):
+    def __init__(self, yml_content, separator=":", loader=None, stats=None,  # pylint: disable = too-many-arguments
+                 compact=False):
         self.separator = separator
-        parsed_yml = self._import_yml(yml_content)
-        self.flat_yml = self._get_flat_dict(parsed_yml)
-        self.list_handler = ListHandler(self.flat_yml, separator)
-        self.scalars = dict(
-            [(key, value) for key, value in self.flat_yml.items() if key not in self.list_handler.list_types]
-        )
-
-    def _get_flat_dict(self, parsed_yml):
+        # Compact handlers keep the flat keys in a path table, which takes less memory but is slower to look up
+        self.compact = compact
+        self.loader = loader or DEFAULT_LOADER
+        self.list_type_pattern = re.compile(RE_LIST_TYPE.format(separator))
+        with time_phase(stats, self.role + " parse"):
+            parsed_yml = self._import_yml(yml_content)
+        with time_phase(stats, self.role + " flatten"):
+            self.flat_yml, self.scalars, list_types = self._get_flat_dicts(parsed_yml)
+        with time_phase(stats, self.role + " grouping"):
+            self.list_handler = ListHandler(self.flat_yml, separator, list_types)
+
+    def _get_flat_dicts(self, parsed_yml):
+        if self.compact:
+            return self._get_path_table_views(parsed_yml)
+        flat_yml, scalars, list_types = {}, {}, {}
+        for key, value, is_list_type in self._flatten_items(parsed_yml):
+            flat_yml[key] = value
+            if is_list_type:
+                list_types[key] = value
+            else:
+                scalars[key] = value
+        return flat_yml, scalars, list_types
+
+    def _get_path_table_views(self, parsed_yml):
+        # The flat keys, the scalars and the list types are dict-style views of a single path table, which is only
+        # imported for compact resources
+        from yaml_rulz.path_table import PathTable
+        path_table = PathTable(self.separator)
+        for key, value, is_list_type in self._flatten_items(parsed_yml):
+            path_table.add(key, value, is_list_type)
+        return path_table.get_items(), path_table.get_scalars(), path_table.get_list_types()
+
+    def _flatten_items(self, parsed_yml):
+        # Depth-first walk with an explicit stack of item iterators, so nesting depth is not limited by recursion.
+        # A key is a list type if it is inside a list or has a numeric segment, just like ListHandler decides.
         if isinstance(parsed_yml, dict):
-            return dict(self._flatten_items(parsed_yml.items(), parent=""))
-        return dict(self._flatten_items([("", parsed_yml)], parent=""))
-
-    def _flatten_items(self, items, parent):
-        flattened_items = []
-        for key, value in items:
-            prefix = parent + str(key)
-            if isinstance(value, list):
-                flattened_items.append((prefix, []))
-                flattened_items.extend(self._flatten_items(list(enumerate(value)), parent=prefix+self.separator))
-            elif isinstance(value, dict):
-                flattened_items.extend(self._flatten_items(value.items(), parent=prefix+self.separator))
+            stack = [(iter(parsed_yml.items()), "", False)]
+        else:
+            stack = [(iter([("", parsed_yml)]), "", False)]
+        while stack:
+            items, parent, in_list = stack[-1]
+            for key, value in items:
+                key = str(key)
+                prefix = parent + key
+                is_list_type = in_list or self.list_type_pattern.search(key) is not None
+                if isinstance(value, list):
+                    yield prefix, [], is_list_type
+                    stack.append((enumerate(value), prefix + self.separator, True))
+                    break
+                if isinstance(value, dict):
+                    stack.append((iter(value.items()), prefix + self.separator, is_list_type))
+                    break
+                yield prefix, value, is_list_type
             else:
-                flattened_items.append((prefix, value))
-        return flattened_items
+                stack.pop()
 
     def _import_yml(self, yml_content):
         try:
-            return yaml.load(yml_content)
+            return yaml.load(yml_content, Loader=self.loader)
         except yaml.YAMLError as exc:
             raise YAMLHandlerError("Error in {0}\n{1}".format(self.role, exc))
 